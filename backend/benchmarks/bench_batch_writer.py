@@ -0,0 +1,81 @@
+"""Concurrent report inserts: one insert_one each vs. the batched writer.
+
+    python benchmarks/bench_batch_writer.py --mongo-uri mongodb://localhost:27017 --reports 20000 --clients 200
+
+Writes into a scratch database (StreetVoiceBench by default) with
+--clients concurrent producers, the way a surge of /report-issue requests
+would, and prints inserts/s and per-insert acknowledgement latency.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from pymongo import AsyncMongoClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models.batch_writer import BatchWriter  # noqa: E402
+
+
+def make_report(i: int) -> dict:
+    return {
+        "image_url": None,
+        "location": f"Sector {i % 60}, Dehradun",
+        "description": f"Drain overflowing onto the road {i}",
+        "tags": "Sewer / Drainage Issues",
+        "reported_at": datetime.utcnow(),
+        "user_id": f"user{i % 5000}@example.com",
+        "status": "submitted",
+    }
+
+
+async def run(insert, reports: int, clients: int):
+    latencies = []
+    counter = iter(range(reports))
+
+    async def producer():
+        for i in counter:
+            start = time.perf_counter()
+            await insert(make_report(i))
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(producer() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    ordered = sorted(latencies)
+    return reports / elapsed, statistics.median(ordered), ordered[int(len(ordered) * 0.99) - 1]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="StreetVoiceBench")
+    parser.add_argument("--reports", type=int, default=20000)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--window-ms", type=float, default=5)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    client = AsyncMongoClient(args.mongo_uri)
+    collection = client[args.db]["batch_writer_bench"]
+    await collection.drop()
+
+    async def insert_one(doc):
+        await collection.insert_one(doc)
+
+    writer = BatchWriter(lambda: collection, args.batch_size, args.window_ms)
+    for name, insert in (("insert_one", insert_one), ("batched", writer.insert)):
+        rate, p50, p99 = await run(insert, args.reports, args.clients)
+        print(f"{name:<11} {rate:8.0f} inserts/s   ack p50={p50:6.1f}ms p99={p99:6.1f}ms")
+    await writer.close()
+
+    await collection.drop()
+    await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+"""Per-item vs. bulk report status updates.
+
+Run the backend against a local mongod, log in as an admin of the Sanitation
+Department and pass its token:
+
+    python benchmarks/bench_bulk_status.py --admin-token <JWT> --reports 10000
+
+Seeds --reports "Garbage / Waste" reports straight into the backend's
+database (MONGODB_URI / MONGODB_DB), moves them all to "in-progress" one
+request at a time through PUT /update-report-status/{id}, then back to
+"submitted" with a single PUT /bulk/update-report-status, and deletes them
+afterwards.
+"""
+import argparse
+import asyncio
+import os
+import time
+from datetime import datetime
+
+import httpx
+from pymongo import MongoClient
+
+MARKER = "bench_bulk_status"
+
+
+def seed(collection, count: int) -> list[str]:
+    now = datetime.utcnow()
+    docs = [{
+        "image_url": None,
+        "location": "Civil Lines, Dehradun",
+        "description": f"{MARKER} {i}",
+        "tags": "Garbage / Waste",
+        "reported_at": now,
+        "user_id": f"{MARKER}@example.com",
+        "status": "submitted",
+    } for i in range(count)]
+    ids = []
+    for start in range(0, count, 10000):
+        ids.extend(collection.insert_many(docs[start:start + 10000]).inserted_ids)
+    return [str(report_id) for report_id in ids]
+
+
+async def per_item(client, ids: list[str], concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def update(report_id):
+        async with semaphore:
+            response = await client.put(f"/update-report-status/{report_id}", json={"new_status": "in-progress"})
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(update(report_id) for report_id in ids))
+    return time.perf_counter() - start
+
+
+async def bulk(client, ids: list[str]) -> float:
+    start = time.perf_counter()
+    response = await client.put("/bulk/update-report-status", json={"ids": ids, "new_status": "submitted"})
+    response.raise_for_status()
+    elapsed = time.perf_counter() - start
+    updated = response.json()["updated"]
+    if updated != len(ids):
+        print(f"warning: bulk updated {updated}/{len(ids)}")
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--admin-token", required=True)
+    parser.add_argument("--reports", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=32, help="parallel per-item requests")
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGODB_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default=os.getenv("MONGODB_DB", "StreetVoice"))
+    args = parser.parse_args()
+
+    collection = MongoClient(args.mongo_uri)[args.db]["reported_issues"]
+    ids = seed(collection, args.reports)
+    headers = {"Authorization": f"Bearer {args.admin_token}"}
+    try:
+        async with httpx.AsyncClient(base_url=args.base_url, headers=headers, timeout=600) as client:
+            item_seconds = await per_item(client, ids, args.concurrency)
+            bulk_seconds = await bulk(client, ids)
+    finally:
+        collection.delete_many({"user_id": f"{MARKER}@example.com"})
+
+    print(f"per-item  {args.reports} updates in {item_seconds:8.2f}s  ({args.reports / item_seconds:8.0f}/s)")
+    print(f"bulk      {args.reports} updates in {bulk_seconds:8.2f}s  ({args.reports / bulk_seconds:8.0f}/s)")
+    print("Run POST /admin/stats/rebuild and /admin/tiles/rebuild afterwards if the counters matter.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,70 @@
+"""/contact latency during a spam flood.
+
+    python benchmarks/bench_contact_flood.py --clients 64 --seconds 20 --repeat 0.5
+
+Every client posts contact messages as fast as it can; --repeat is the
+share of posts that resend one of a few fixed messages (deduplicated by
+the server), the rest are unique. Latency is printed per second of the run
+so a latency that grows with the backlog shows up, along with the status
+code counts.
+
+All traffic comes from one IP, so start the server with a large
+CONTACT_RATE_PER_IP (and CONTACT_RATE_PER_EMAIL) unless the limiter
+itself is what you want to measure.
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from results import latency_summary  # noqa: E402
+
+
+async def flood(client, stop_at, repeat, started, samples, statuses, seed):
+    rng = random.Random(seed)
+    while time.perf_counter() < stop_at:
+        if rng.random() < repeat:
+            n = rng.randint(1, 5)
+            form = {"name": "Spammer", "email": f"spam{n}@bench.local", "message": f"Buy now! Offer {n}"}
+        else:
+            n = rng.randrange(1_000_000_000)
+            form = {"name": "Resident", "email": f"user{n % 5000}@bench.local", "message": f"Streetlight out, ref {n}"}
+        start = time.perf_counter()
+        response = await client.post("/contact", json=form)
+        samples[int(start - started)].append((time.perf_counter() - start) * 1000)
+        statuses[response.status_code] += 1
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--repeat", type=float, default=0.5, help="share of posts that resend a known message")
+    args = parser.parse_args()
+
+    samples, statuses = defaultdict(list), Counter()
+    limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=30, limits=limits) as client:
+        started = time.perf_counter()
+        stop_at = started + args.seconds
+        await asyncio.gather(*(
+            flood(client, stop_at, args.repeat, started, samples, statuses, seed) for seed in range(args.clients)
+        ))
+
+    for second in sorted(samples):
+        summary = latency_summary(samples[second])
+        print(f"t={second:>3}s  n={len(samples[second]):<6} p50={summary['p50_ms']:7.1f}ms p99={summary['p99_ms']:7.1f}ms")
+    total = sum(statuses.values())
+    print(f"\n{total / args.seconds:.0f} req/s, statuses: {dict(statuses)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+"""Requests/sec for /login and /all-reports under concurrent clients.
+
+Run the backend against a local mongod (MONGODB_URI=mongodb://localhost:27017),
+register a user and an admin, then:
+
+    python benchmarks/bench_db_throughput.py --email u@x.com --password pw \
+        --admin-token <JWT> --clients 32 --seconds 15
+
+Run it once on the commit before the async driver migration and once after to
+compare.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def drive(client, request, stop_at, latencies, errors):
+    while time.perf_counter() < stop_at:
+        start = time.perf_counter()
+        try:
+            response = await request(client)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def bench(base_url, name, request, clients, seconds):
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, timeout=30, limits=limits) as client:
+        stop_at = time.perf_counter() + seconds
+        await asyncio.gather(*(drive(client, request, stop_at, latencies, errors) for _ in range(clients)))
+
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(
+        f"{name:<14} {len(latencies) / seconds:8.1f} req/s   "
+        f"p50={statistics.median(latencies):7.1f}ms p99={p99:7.1f}ms errors={len(errors)}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--admin-token", required=True)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=15)
+    args = parser.parse_args()
+
+    credentials = {"email": args.email, "password": args.password}
+    admin_headers = {"Authorization": f"Bearer {args.admin_token}"}
+
+    await bench(
+        args.base_url, "/login",
+        lambda c: c.post("/login", json=credentials),
+        args.clients, args.seconds,
+    )
+    await bench(
+        args.base_url, "/all-reports",
+        lambda c: c.get("/all-reports", params={"limit": 20}, headers=admin_headers),
+        args.clients, args.seconds,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,69 @@
+"""In-process fan-out cost of the report event bus.
+
+    python benchmarks/bench_events_fanout.py --subscribers 5000 --events 1000
+
+Opens --subscribers idle subscriptions on one department channel (what
+/events?scope=department holds per connection), reports the memory they
+take, then times publishing --events report events to all of them while a
+reader task per subscriber drains its buffer.
+"""
+import argparse
+import asyncio
+import sys
+import time
+import tracemalloc
+from contextlib import ExitStack
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models import events  # noqa: E402
+
+REPORT = {"_id": "66a0f0c2e1d3b2a4c5d6e7f8", "tags": "Garbage / Waste", "status": "submitted", "user_id": "u@x.com"}
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=1000)
+    args = parser.parse_args()
+
+    channel = events.department_channel("Sanitation Department")
+    with ExitStack() as stack:
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        subscribers = [stack.enter_context(events.subscribe([channel])) for _ in range(args.subscribers)]
+        idle_bytes = (tracemalloc.get_traced_memory()[0] - before) / args.subscribers
+        tracemalloc.stop()
+
+        received = 0
+
+        async def reader(subscriber):
+            nonlocal received
+            while True:
+                messages, dropped = await subscriber.next_batch(1.0)
+                received += len(messages)
+
+        readers = [asyncio.create_task(reader(subscriber)) for subscriber in subscribers]
+        await asyncio.sleep(0)
+
+        start = time.perf_counter()
+        for _ in range(args.events):
+            events.publish("report_status_changed", REPORT, previous_status="submitted")
+            await asyncio.sleep(0)
+        publish_seconds = time.perf_counter() - start
+        await asyncio.sleep(0.1)
+
+        for task in readers:
+            task.cancel()
+        await asyncio.gather(*readers, return_exceptions=True)
+
+    deliveries = args.events * args.subscribers
+    print(f"idle subscriber        {idle_bytes:8.0f} bytes each")
+    print(f"fan-out                {deliveries / publish_seconds:8.0f} deliveries/s "
+          f"({publish_seconds * 1e6 / args.events:.0f}us per event to {args.subscribers} subscribers)")
+    print(f"received               {received}/{deliveries} (rest dropped by bounded buffers)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
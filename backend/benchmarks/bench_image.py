@@ -0,0 +1,67 @@
+"""Micro-benchmark for report image normalization.
+
+    python benchmarks/bench_image.py --runs 10
+
+Compares the old full-resolution re-encode with models.image.normalize_image
+on synthetic phone-sized photos, reporting bytes out and ms per image.
+"""
+import argparse
+import statistics
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models.image import normalize_image  # noqa: E402
+
+SIZES = {"4MP": (2304, 1728), "8MP": (3264, 2448), "12MP": (4000, 3000)}
+
+
+def make_photo(width: int, height: int) -> bytes:
+    # Gradient plus noise looks more like a photo to the encoder than flat colour
+    noise = Image.effect_noise((width, height), 32).convert("RGB")
+    gradient = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    image = Image.blend(noise, gradient, 0.6)
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=92)
+    return buffer.getvalue()
+
+
+def full_resolution_reencode(data: bytes) -> tuple[bytes, bytes]:
+    # What compress_image used to do before handing the image to Cloudinary
+    image = Image.open(BytesIO(data)).convert("RGB")
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=70)
+    return buffer.getvalue(), b""
+
+
+def run(label, fn, data, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        image, thumbnail = fn(data)
+        timings.append((time.perf_counter() - start) * 1000)
+    print(
+        f"  {label:<24} {statistics.median(timings):8.1f} ms/image   "
+        f"out={len(image) / 1024:7.0f} KiB   thumb={len(thumbnail) / 1024:5.0f} KiB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    for name, (width, height) in SIZES.items():
+        data = make_photo(width, height)
+        print(f"{name} ({width}x{height}, in={len(data) / 1024:.0f} KiB)")
+        run("full-resolution q70", full_resolution_reencode, data, args.runs)
+        run("normalize_image", normalize_image, data, args.runs)
+
+
+if __name__ == "__main__":
+    main()
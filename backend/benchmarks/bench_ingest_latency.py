@@ -0,0 +1,107 @@
+"""Latency of unrelated endpoints while report uploads are in flight.
+
+Start the backend first (uvicorn main:app), then run:
+
+    python benchmarks/bench_ingest_latency.py --token <JWT> --uploads 50
+
+The probe endpoints are hit continuously, first with no load and then while
+`--uploads` concurrent POST /report-issue requests are running.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from io import BytesIO
+
+import httpx
+from PIL import Image
+
+
+def make_photo(width: int = 4000, height: int = 3000) -> bytes:
+    # Noisy image so the JPEG encoder has real work to do
+    image = Image.effect_noise((width, height), 64).convert("RGB")
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=95)
+    return buffer.getvalue()
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def probe(client, paths, headers, stop: asyncio.Event, samples: list):
+    while not stop.is_set():
+        for path in paths:
+            start = time.perf_counter()
+            await client.get(path, headers=headers)
+            samples.append((time.perf_counter() - start) * 1000)
+
+
+async def upload(client, headers, photo: bytes):
+    start = time.perf_counter()
+    response = await client.post(
+        "/report-issue",
+        headers=headers,
+        files={"image": ("photo.jpg", photo, "image/jpeg")},
+        data={
+            "location": "Benchmark Street",
+            "description": "Benchmark upload",
+            "tags": "Road Damage / Potholes",
+        },
+    )
+    response.raise_for_status()
+    return (time.perf_counter() - start) * 1000
+
+
+async def measure(client, paths, headers, seconds=None, uploads=None, photo=None):
+    samples: list = []
+    stop = asyncio.Event()
+    probers = [asyncio.create_task(probe(client, paths, headers, stop, samples)) for _ in range(4)]
+
+    upload_ms = []
+    if uploads:
+        upload_ms = await asyncio.gather(*(upload(client, headers, photo) for _ in range(uploads)))
+    else:
+        await asyncio.sleep(seconds)
+
+    stop.set()
+    await asyncio.gather(*probers)
+    return samples, upload_ms
+
+
+def report(label, samples):
+    print(
+        f"{label:<22} n={len(samples):<6} "
+        f"p50={statistics.median(samples):8.1f}ms "
+        f"p99={percentile(samples, 99):8.1f}ms "
+        f"max={max(samples):8.1f}ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token", required=True)
+    parser.add_argument("--uploads", type=int, default=50)
+    parser.add_argument("--probe", action="append", default=None, help="path to probe (repeatable)")
+    args = parser.parse_args()
+
+    paths = args.probe or ["/", "/me"]
+    headers = {"Authorization": f"Bearer {args.token}"}
+    photo = make_photo()
+    print(f"photo size: {len(photo) / 1024:.0f} KiB, probing {paths}")
+
+    limits = httpx.Limits(max_connections=args.uploads + 8)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=120, limits=limits) as client:
+        idle, _ = await measure(client, paths, headers, seconds=5)
+        report("idle", idle)
+
+        loaded, upload_ms = await measure(client, paths, headers, uploads=args.uploads, photo=photo)
+        report(f"{args.uploads} uploads in flight", loaded)
+        report("upload requests", upload_ms)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+"""Concurrent logins/sec and unrelated-endpoint latency during a login storm.
+
+    python benchmarks/bench_login_storm.py --email u@x.com --password pw \
+        --token <JWT> --clients 64 --seconds 15
+
+All storm traffic comes from one IP, so the per-IP/per-email limiters will
+answer most of it with 429. To measure raw bcrypt throughput instead, start
+the server with large PASSWORD_RATE_PER_IP / PASSWORD_RATE_PER_EMAIL /
+PASSWORD_CONCURRENCY_PER_KEY values.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+
+def summary(samples):
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return f"n={len(samples):<6} p50={statistics.median(samples):7.1f}ms p99={p99:7.1f}ms"
+
+
+async def storm(client, credentials, stop_at, statuses):
+    while time.perf_counter() < stop_at:
+        response = await client.post("/login", json=credentials)
+        statuses[response.status_code] += 1
+
+
+async def probe(client, headers, stop_at, samples):
+    while time.perf_counter() < stop_at:
+        start = time.perf_counter()
+        await client.get("/my-reports", params={"limit": 10}, headers=headers)
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.05)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--token", required=True, help="token for the unrelated-endpoint probe")
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=15)
+    args = parser.parse_args()
+
+    credentials = {"email": args.email, "password": args.password}
+    headers = {"Authorization": f"Bearer {args.token}"}
+    limits = httpx.Limits(max_connections=args.clients + 4)
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60, limits=limits) as client:
+        idle = []
+        await probe(client, headers, time.perf_counter() + 5, idle)
+        print(f"/my-reports idle          {summary(idle)}")
+
+        statuses, loaded = Counter(), []
+        stop_at = time.perf_counter() + args.seconds
+        await asyncio.gather(
+            probe(client, headers, stop_at, loaded),
+            *(storm(client, credentials, stop_at, statuses) for _ in range(args.clients)),
+        )
+        print(f"/my-reports during storm  {summary(loaded)}")
+        print(f"successful logins/sec     {statuses[200] / args.seconds:.1f}")
+        print(f"login responses           {dict(statuses)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
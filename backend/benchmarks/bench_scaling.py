@@ -0,0 +1,105 @@
+"""Throughput of /all-reports and /report-issue as uvicorn workers are added.
+
+    python benchmarks/bench_scaling.py --workers 1,2,4,8 --seconds 30
+    python benchmarks/bench_scaling.py --state-backend mongo --scenarios all_reports
+
+For every worker count and scenario this runs loadtest.py once (fresh
+database, fake external services) with the backend in its multi-worker
+deployment mode: STATE_BACKEND shared (redis by default, or mongo), the
+Mongo-backed suggestion queue and the response cache in the same backend
+(off for mongo). On a replica set add --env EVENTS_SOURCE=changestream to
+include the SSE change-stream watcher each worker would run.
+
+It prints requests/sec, the speedup over the smallest worker count and
+the per-worker efficiency (speedup / workers). The load generator is a
+single process, so give it enough --clients and check that its own CPU
+is not the ceiling before reading flat scaling as a backend limit.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR))
+
+from results import compare, git_commit, write_results  # noqa: E402
+
+
+def deployment_env(state_backend: str) -> list[str]:
+    return [
+        f"STATE_BACKEND={state_backend}",
+        f"RESPONSE_CACHE_BACKEND={'redis' if state_backend == 'redis' else 'off'}",
+        "SUGGESTION_QUEUE=mongo",
+    ]
+
+
+def run_loadtest(args, workers: int, scenario: str) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / "result.json"
+        command = [
+            sys.executable, str(BENCH_DIR / "loadtest.py"),
+            "--workers", str(workers),
+            "--mix", f"{scenario}=1",
+            "--seconds", str(args.seconds),
+            "--warmup", str(args.warmup),
+            "--clients", str(args.clients),
+            "--output", str(output),
+        ]
+        if args.mongo_uri:
+            command += ["--mongo-uri", args.mongo_uri]
+        for setting in deployment_env(args.state_backend) + args.env:
+            command += ["--env", setting]
+        subprocess.run(command, check=True)
+        return json.loads(output.read_text())["results"][scenario]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", default="1,2,4,8")
+    parser.add_argument("--scenarios", default="all_reports,submit")
+    parser.add_argument("--state-backend", choices=["redis", "mongo"], default="redis")
+    parser.add_argument("--mongo-uri")
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--clients", type=int, default=128)
+    parser.add_argument("--env", action="append", default=[], help="extra backend setting, KEY=VALUE")
+    parser.add_argument("--output", help="result file (default benchmarks/results/scaling-<commit>.json)")
+    parser.add_argument("--compare", help="earlier result file to compare against")
+    args = parser.parse_args()
+
+    worker_counts = [int(n) for n in args.workers.split(",")]
+    results = {}
+    for scenario in args.scenarios.split(","):
+        baseline = None
+        for workers in worker_counts:
+            result = run_loadtest(args, workers, scenario)
+            baseline = baseline or result["rps"]
+            speedup = result["rps"] / baseline if baseline else 0.0
+            results[f"{scenario}.workers_{workers}"] = {
+                "rps": result["rps"],
+                "p50_ms": result["p50_ms"],
+                "p99_ms": result["p99_ms"],
+                "errors": result["errors"],
+                "speedup": round(speedup, 3),
+                # 1.0 is perfectly linear scaling from the smallest worker count
+                "efficiency": round(speedup * worker_counts[0] / workers, 3),
+            }
+
+    print(f"\n{'case':<28} {'rps':>9} {'p50 ms':>9} {'p99 ms':>9} {'speedup':>8} {'efficiency':>11}")
+    for name, m in results.items():
+        print(f"{name:<28} {m['rps']:>9} {m['p50_ms']:>9} {m['p99_ms']:>9} {m['speedup']:>8} {m['efficiency']:>11}")
+
+    output = args.output or str(BENCH_DIR / "results" / f"scaling-{git_commit() or 'local'}.json")
+    config = {key: value for key, value in vars(args).items() if key not in ("output", "compare", "mongo_uri")}
+    document = write_results(output, "scaling", config, results)
+    print(f"wrote {output}")
+    if args.compare:
+        print()
+        compare(json.loads(Path(args.compare).read_text()), document)
+
+
+if __name__ == "__main__":
+    main()
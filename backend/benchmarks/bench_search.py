@@ -0,0 +1,101 @@
+"""Search query benchmark over a synthetic reported_issues collection.
+
+    python benchmarks/bench_search.py --mongo-uri mongodb://localhost:27017 --reports 1000000
+
+Seeds a separate database (StreetVoiceBench by default; pass --reseed to
+rebuild it) with the app's indexes, then times the old unanchored $regex
+search against the filters produced by models.search.build_report_filter.
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from pymongo import MongoClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models.categories import category_to_department  # noqa: E402
+from models.indexes import INDEXES  # noqa: E402
+from models.pagination import REPORT_SORT  # noqa: E402
+from models.search import build_report_filter, location_key  # noqa: E402
+
+AREAS = ["Sector", "Nehru Nagar", "MG Road", "Civil Lines", "Rajpur", "Lake View", "Old Market", "Station Road"]
+CITIES = ["Dehradun", "Lucknow", "Pune", "Indore", "Jaipur"]
+WORDS = ["pothole", "overflowing", "broken", "leaking", "dark", "blocked", "smell", "dangerous",
+         "children", "school", "night", "traffic", "water", "garbage", "wire", "tree", "drain"]
+STATUSES = ["submitted", "in-progress", "resolved", "rejected"]
+
+
+def make_report(rng: random.Random, start: datetime) -> dict:
+    location = f"{rng.choice(AREAS)} {rng.randint(1, 60)}, {rng.choice(CITIES)}"
+    return {
+        "image_url": None,
+        "location": location,
+        "location_lc": location_key(location),
+        "description": " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 20))),
+        "tags": rng.choice(list(category_to_department)),
+        "reported_at": start + timedelta(seconds=rng.randint(0, 365 * 24 * 3600)),
+        "user_id": f"user{rng.randint(1, 50000)}@example.com",
+        "status": rng.choice(STATUSES),
+    }
+
+
+def seed(collection, count: int, batch: int = 10000):
+    rng = random.Random(42)
+    start = datetime(2024, 1, 1)
+    for offset in range(0, count, batch):
+        collection.insert_many([make_report(rng, start) for _ in range(min(batch, count - offset))], ordered=False)
+        print(f"\rseeded {min(offset + batch, count)}/{count}", end="", flush=True)
+    print()
+    collection.create_indexes(INDEXES["reported_issues"])
+
+
+def time_query(collection, filter_query, runs: int, limit: int = 20):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        list(collection.find(filter_query, {"_id": 1}).sort(REPORT_SORT).limit(limit))
+        timings.append((time.perf_counter() - start) * 1000)
+    plan = collection.find(filter_query).sort(REPORT_SORT).limit(limit).explain()
+    docs_examined = plan.get("executionStats", {}).get("totalDocsExamined")
+    return statistics.median(timings), max(timings), docs_examined
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="StreetVoiceBench")
+    parser.add_argument("--reports", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--reseed", action="store_true")
+    args = parser.parse_args()
+
+    collection = MongoClient(args.mongo_uri)[args.db]["reported_issues"]
+    if args.reseed:
+        collection.drop()
+    if collection.estimated_document_count() < args.reports:
+        collection.drop()
+        seed(collection, args.reports)
+
+    regex = {"$regex": "nehru", "$options": "i"}
+    cases = [
+        ("legacy regex search", {"$or": [{"tags": regex}, {"location": regex}]}),
+        ("legacy regex tag", {"tags": {"$regex": "garbage", "$options": "i"}}),
+        ("text search", build_report_filter(search="overflowing drain")),
+        ("text search + status", build_report_filter(search="overflowing drain", status="submitted")),
+        ("exact tag", build_report_filter(tag="garbage / waste")),
+        ("tag + status", build_report_filter(tag="Garbage / Waste", status="submitted")),
+        ("location prefix", build_report_filter(location="Nehru Nagar 1")),
+    ]
+    print(f"{'query':<24} {'p50 ms':>9} {'max ms':>9} {'docs examined':>14}")
+    for name, filter_query in cases:
+        p50, worst, docs = time_query(collection, filter_query, args.runs)
+        print(f"{name:<24} {p50:9.1f} {worst:9.1f} {docs!s:>14}")
+
+
+if __name__ == "__main__":
+    main()
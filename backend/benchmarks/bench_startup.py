@@ -0,0 +1,124 @@
+"""Worker cold-start cost: `import main` time and time to first request.
+
+    python benchmarks/bench_startup.py --runs 10
+    python benchmarks/bench_startup.py --runs 10 --compare benchmarks/results/startup-abc1234.json
+
+Each run starts a fresh interpreter. `import main` is measured with
+`python -X importtime`, which also gives the modules that dominate it
+(--top). Time to first request starts a uvicorn worker and polls GET /
+until it answers, so it includes the lifespan startup; with the default
+environment that needs a reachable MONGODB_URI only when
+AUTO_CREATE_INDEXES is on (it is switched off here unless passed via --env).
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from results import compare, git_commit, latency_summary, print_table, write_results  # noqa: E402
+
+
+def import_time(env: dict) -> tuple[float, dict[str, int]]:
+    """Return (ms, {module imported by main: cumulative us}) for one `import main`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    # Lines look like "import time:  self [us] | cumulative | imported package",
+    # with nested imports indented by two more spaces and listed before the
+    # module that imported them
+    children = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 0:
+            if name.strip() == "main":
+                return int(cumulative) / 1000, children
+            children = {}
+        elif depth == 1:
+            children[name.strip()] = int(cumulative)
+    raise SystemExit("`import main` did not show up in the -X importtime output")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def first_request_time(env: dict, timeout: float = 60) -> float:
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise SystemExit(f"Server exited with code {process.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.01)
+        raise SystemExit("Server did not answer in time")
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest imports under main to list")
+    parser.add_argument("--skip-server", action="store_true", help="only measure `import main`")
+    parser.add_argument("--env", action="append", default=[], help="extra backend setting, KEY=VALUE")
+    parser.add_argument("--output", help="result file (default benchmarks/results/startup-<commit>.json)")
+    parser.add_argument("--compare", help="earlier result file to compare against")
+    args = parser.parse_args()
+
+    env = {**os.environ, "AUTO_CREATE_INDEXES": "false", "LOG_LEVEL": "WARNING"}
+    for override in args.env:
+        key, _, value = override.partition("=")
+        env[key] = value
+
+    totals, slowest = [], {}
+    for _ in range(args.runs):
+        total, modules = import_time(env)
+        totals.append(total)
+        for name, cumulative in modules.items():
+            slowest[name] = min(cumulative, slowest.get(name, cumulative))
+
+    print(f"slowest imports under main (best of {args.runs} runs):")
+    for name, cumulative in sorted(slowest.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+    print()
+
+    results = {"import_main": latency_summary(totals)}
+    if not args.skip_server:
+        results["first_request"] = latency_summary([first_request_time(env) for _ in range(args.runs)])
+    print_table(results)
+
+    output = args.output or str(Path(__file__).resolve().parent / "results" / f"startup-{git_commit() or 'local'}.json")
+    config = {"runs": args.runs, "env": args.env, "python": sys.version.split()[0]}
+    document = write_results(output, "startup", config, results)
+    print(f"wrote {output}")
+    if args.compare:
+        print()
+        compare(json.loads(Path(args.compare).read_text()), document)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Cache and request-coalescing benchmark for the Gemini suggestion client.
+
+Start the stub first:
+
+    python benchmarks/fake_gemini.py --port 8089 --latency 1.0
+    python benchmarks/bench_suggestion.py --stub-url http://localhost:8089
+
+Runs models.suggestion.get_suggestion in-process against the stub and
+prints latency plus how many calls actually reached the upstream.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+async def timed(fn, *args):
+    start = time.perf_counter()
+    await fn(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+async def upstream_calls(stub_url: str) -> int:
+    async with httpx.AsyncClient() as client:
+        return (await client.get(f"{stub_url}/calls")).json()["calls"]
+
+
+async def scenario(name, stub_url, requests):
+    from models.suggestion import get_suggestion
+
+    before = await upstream_calls(stub_url)
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(timed(get_suggestion, *args) for args in requests))
+    elapsed = time.perf_counter() - start
+    calls = await upstream_calls(stub_url) - before
+    print(
+        f"{name:<34} requests={len(requests):<5} upstream_calls={calls:<4} "
+        f"p50={statistics.median(latencies):8.1f}ms max={max(latencies):8.1f}ms wall={elapsed:6.2f}s"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stub-url", default="http://localhost:8089")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--distinct", type=int, default=10)
+    args = parser.parse_args()
+
+    # Must be set before models.suggestion is imported
+    os.environ["GEMINI_BASE_URL"] = args.stub_url
+    from models.suggestion import close_client
+
+    same = [("Garbage / Waste", "MG Road", "Overflowing bin near the bus stop")] * args.concurrency
+    # Same reports again, differing only in case/whitespace
+    variants = [("garbage / waste", "  mg road ", "Overflowing  bin near the bus stop")] * args.concurrency
+    mixed = [
+        ("Street Lights", f"Sector {i % args.distinct}", "Street light not working for a week")
+        for i in range(args.concurrency)
+    ]
+
+    await scenario("identical, cold (coalesced)", args.stub_url, same)
+    await scenario("identical, warm (cached)", args.stub_url, same)
+    await scenario("normalized variants (cached)", args.stub_url, variants)
+    await scenario(f"{args.distinct} distinct keys, cold", args.stub_url, mixed)
+    await close_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,61 @@
+"""Time-to-first-token of streamed vs. non-streamed suggestions.
+
+    python benchmarks/fake_gemini.py --port 8089 --latency 4.0 --first-token 0.3
+    python benchmarks/bench_suggestion_stream.py --stub-url http://localhost:8089
+
+Each run uses a fresh description so the suggestion cache never answers.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+async def blocking_run(description: str):
+    from models.suggestion import get_suggestion
+
+    start = time.perf_counter()
+    await get_suggestion("Sewer / Drainage Issues", "Civil Lines", description)
+    total = (time.perf_counter() - start) * 1000
+    # The whole answer arrives at once, so first token == last token
+    return total, total
+
+
+async def streaming_run(description: str):
+    from models.suggestion import stream_suggestion
+
+    start = time.perf_counter()
+    first = None
+    async for _ in stream_suggestion("Sewer / Drainage Issues", "Civil Lines", description):
+        if first is None:
+            first = (time.perf_counter() - start) * 1000
+    return first, (time.perf_counter() - start) * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stub-url", default="http://localhost:8089")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    os.environ["GEMINI_BASE_URL"] = args.stub_url
+    from models.suggestion import close_client
+
+    for name, run in (("generateContent", blocking_run), ("streamGenerateContent", streaming_run)):
+        results = [await run(f"Drain overflowing onto the road, run {name} {i}") for i in range(args.runs)]
+        first = [r[0] for r in results]
+        total = [r[1] for r in results]
+        print(
+            f"{name:<22} first token p50={statistics.median(first):7.1f}ms max={max(first):7.1f}ms   "
+            f"complete p50={statistics.median(total):7.1f}ms"
+        )
+    await close_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
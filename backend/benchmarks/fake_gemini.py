@@ -0,0 +1,88 @@
+"""Local stand-in for the Gemini generateContent / streamGenerateContent API.
+
+    python benchmarks/fake_gemini.py --port 8089 --latency 2.0 --first-token 0.3
+
+generateContent answers after --latency seconds. streamGenerateContent
+(alt=sse) sends its first chunk after --first-token seconds and spreads the
+rest of the answer over the remaining --latency.
+
+Point the backend at it with GEMINI_BASE_URL=http://localhost:8089.
+GET /calls returns how many generate requests reached the stub, which is
+what the cache and coalescing checks compare against; POST /reset zeroes it.
+"""
+import argparse
+import asyncio
+import json
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+app = FastAPI()
+app.state.latency = 1.0
+app.state.first_token = 0.3
+app.state.calls = 0
+
+
+def fake_answer(prompt: str) -> str:
+    details = prompt.split("Report Details:", 1)[-1].strip()
+    return (
+        "1. Inspect the site and secure the area.\n"
+        "2. Assign the responsible municipal department.\n"
+        "3. Expected resolution: 2-3 working days.\n"
+        "4. Schedule periodic checks to prevent recurrence.\n\n"
+        f"(stub answer for: {details[:120]})"
+    )
+
+
+def chunk(text: str) -> dict:
+    return {"candidates": [{"content": {"parts": [{"text": text}]}}]}
+
+
+async def stream_answer(prompt: str):
+    words = fake_answer(prompt).split(" ")
+    pieces = [" ".join(words[i:i + 8]) + " " for i in range(0, len(words), 8)]
+    await asyncio.sleep(app.state.first_token)
+    delay = max(app.state.latency - app.state.first_token, 0) / max(len(pieces) - 1, 1)
+    for index, piece in enumerate(pieces):
+        if index:
+            await asyncio.sleep(delay)
+        yield f"data: {json.dumps(chunk(piece))}\r\n\r\n"
+
+
+@app.post("/v1beta/models/{model_action}")
+async def generate(model_action: str, request: Request):
+    body = await request.json()
+    prompt = body["contents"][0]["parts"][0]["text"]
+
+    if model_action.endswith(":streamGenerateContent"):
+        app.state.calls += 1
+        return StreamingResponse(stream_answer(prompt), media_type="text/event-stream")
+    if not model_action.endswith(":generateContent"):
+        raise HTTPException(status_code=404, detail="Unknown action")
+
+    app.state.calls += 1
+    await asyncio.sleep(app.state.latency)
+    return chunk(fake_answer(prompt))
+
+
+@app.get("/calls")
+async def calls():
+    return {"calls": app.state.calls}
+
+
+@app.post("/reset")
+async def reset():
+    app.state.calls = 0
+    return {"calls": 0}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=1.0, help="seconds per generate call")
+    parser.add_argument("--first-token", type=float, default=0.3, help="seconds before the first streamed chunk")
+    args = parser.parse_args()
+    app.state.latency = args.latency
+    app.state.first_token = args.first_token
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
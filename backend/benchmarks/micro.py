@@ -0,0 +1,132 @@
+"""Micro-benchmarks for the CPU-bound pieces of a request, without Mongo or HTTP.
+
+    python benchmarks/micro.py --seconds 2
+    python benchmarks/micro.py --only token --compare benchmarks/results/micro-abc1234.json
+
+Cases:
+    image.*      models.image.normalize_image on synthetic 4MP/12MP photos
+    token.*      email_from_token for app JWTs (cold and principal-cached) and
+                 Google ID tokens signed by fake_services.GoogleSigner, with
+                 the signing certs preloaded so nothing touches the network
+    query.*      build_report_filter for typical /all-reports filters, plus
+                 cursor encode/decode
+
+Each case reports ops_per_sec and p50/p95/p99 in microseconds and the whole
+run is written to --output in the format results.py compares.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from bson import ObjectId
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+os.environ.setdefault("GOOGLE_CLIENT_ID", "bench-client-id")
+
+from bench_image import make_photo  # noqa: E402
+from results import compare, git_commit, latency_summary, print_table, write_results  # noqa: E402
+
+from models import tokens  # noqa: E402
+from models.image import normalize_image  # noqa: E402
+from models.pagination import decode_cursor, encode_cursor  # noqa: E402
+from models.search import build_report_filter  # noqa: E402
+
+
+def measure(fn, seconds: float, setup=None) -> dict:
+    # Run fn repeatedly for `seconds`; setup (untimed) runs before every call
+    samples = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline or len(samples) < 5:
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    total = sum(samples) / 1_000_000
+    return {"runs": len(samples), "ops_per_sec": round(len(samples) / total, 1), **latency_summary(samples, "us")}
+
+
+def image_cases():
+    for label, size in {"4MP": (2304, 1728), "12MP": (4000, 3000)}.items():
+        photo = make_photo(*size)
+        yield f"image.normalize_{label}", lambda photo=photo: normalize_image(photo), None
+
+
+def token_cases():
+    loop = asyncio.new_event_loop()
+    app_token = tokens.jwt.encode(
+        {"sub": "bench@example.com", "exp": datetime.utcnow() + timedelta(hours=1)},
+        tokens.SECRET_KEY, algorithm=tokens.ALGORITHM,
+    )
+
+    def resolve(token):
+        return lambda: loop.run_until_complete(tokens.email_from_token(token))
+
+    yield "token.app_jwt_cold", resolve(app_token), tokens._principal_cache.clear
+    yield "token.app_jwt_cached", resolve(app_token), None
+
+    try:
+        import google.auth  # noqa: F401
+        from fake_services import GoogleSigner
+    except ImportError:
+        print("skipping Google token cases (google-auth or cryptography missing)")
+        return
+    signer = GoogleSigner()
+    tokens._certs = {signer.kid: signer.certificate_pem}
+    tokens._certs_expire_at = time.monotonic() + 3600
+    google_token = signer.mint("bench@example.com", tokens.GOOGLE_CLIENT_ID)
+    yield "token.google_cold", resolve(google_token), tokens._principal_cache.clear
+    yield "token.google_cached", resolve(google_token), None
+
+
+def query_cases():
+    filters = {
+        "none": {},
+        "status": {"status": "submitted"},
+        "tag_status": {"tag": "Garbage / Waste", "status": "in-progress"},
+        "location_date": {"location": "Rajpur Road", "date": "2025-06-01"},
+        "search_text": {"search": "overflowing bin near the market"},
+        "search_category": {"search": "pothole"},
+    }
+    for label, params in filters.items():
+        yield f"query.filter_{label}", lambda params=params: build_report_filter(**params), None
+
+    cursor = encode_cursor(datetime.utcnow(), ObjectId())
+    yield "query.cursor_encode", lambda: encode_cursor(datetime.utcnow(), ObjectId()), None
+    yield "query.cursor_decode", lambda: decode_cursor(cursor), None
+
+
+GROUPS = {"image": image_cases, "token": token_cases, "query": query_cases}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=1.0, help="time spent on each case")
+    parser.add_argument("--only", choices=list(GROUPS), action="append", help="run only these groups")
+    parser.add_argument("--output", help="result file (default benchmarks/results/micro-<commit>.json)")
+    parser.add_argument("--compare", help="earlier result file to compare against")
+    args = parser.parse_args()
+
+    results = {}
+    for group in args.only or GROUPS:
+        for name, fn, setup in GROUPS[group]():
+            results[name] = measure(fn, args.seconds, setup)
+            print_table({name: results[name]})
+
+    output = args.output or str(Path(__file__).resolve().parent / "results" / f"micro-{git_commit() or 'local'}.json")
+    document = write_results(output, "micro", {"seconds": args.seconds, "groups": args.only or list(GROUPS)}, results)
+    print(f"wrote {output}")
+    if args.compare:
+        print()
+        compare(json.loads(Path(args.compare).read_text()), document)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Shared result format for loadtest.py and micro.py, plus a comparison CLI.
+
+    python benchmarks/results.py results/before.json results/after.json
+
+Each result file is JSON: {"kind", "commit", "timestamp", "config",
+"results": {name: {metric: value}}}. The comparison prints every metric
+of every case side by side with the relative change.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+# For these metrics a higher value is better; everything else is a latency
+HIGHER_IS_BETTER = {"rps", "ops_per_sec", "speedup", "efficiency"}
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def latency_summary(samples: list[float], unit: str = "ms") -> dict:
+    ordered = sorted(samples)
+    return {
+        f"p50_{unit}": round(percentile(ordered, 0.50), 3),
+        f"p95_{unit}": round(percentile(ordered, 0.95), 3),
+        f"p99_{unit}": round(percentile(ordered, 0.99), 3),
+        f"mean_{unit}": round(statistics.fmean(ordered), 3) if ordered else 0.0,
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path: str, kind: str, config: dict, results: dict) -> dict:
+    document = {
+        "kind": kind,
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": config,
+        "results": results,
+    }
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(json.dumps(document, indent=2, sort_keys=True))
+    return document
+
+
+def print_table(results: dict):
+    for name, metrics in results.items():
+        values = "  ".join(f"{metric}={value}" for metric, value in metrics.items())
+        print(f"{name:<28} {values}")
+
+
+def compare(old: dict, new: dict):
+    print(f"{'case':<28} {'metric':<12} {old.get('commit') or 'old':>12} {new.get('commit') or 'new':>12}   change")
+    for name, metrics in new["results"].items():
+        before = old["results"].get(name, {})
+        for metric, value in metrics.items():
+            if metric not in before or not isinstance(value, (int, float)):
+                continue
+            previous = before[metric]
+            change = (value - previous) / previous * 100 if previous else 0.0
+            worse = change < 0 if metric in HIGHER_IS_BETTER else change > 0
+            flag = "  <-- worse" if worse and abs(change) >= 10 else ""
+            print(f"{name:<28} {metric:<12} {previous:>12} {value:>12}   {change:+6.1f}%{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("old")
+    parser.add_argument("new")
+    args = parser.parse_args()
+    compare(json.loads(Path(args.old).read_text()), json.loads(Path(args.new).read_text()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
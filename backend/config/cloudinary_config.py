@@ -1,14 +1,20 @@
 import cloudinary
 import cloudinary.uploader
 import cloudinary.api
-import os
-from dotenv import load_dotenv
 
-load_dotenv()  # Load environment variables from a .env file
+from config.settings import settings
 
-# Configure Cloudinary using your environment variables
-cloudinary.config(
-    cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
-    api_key=os.getenv("CLOUDINARY_API_KEY"),
-    api_secret=os.getenv("CLOUDINARY_API_SECRET")
-)
+_configured = False
+
+
+def configure_cloudinary():
+    # Configure Cloudinary using your environment variables (only once)
+    global _configured
+    if _configured:
+        return
+    cloudinary.config(
+        cloud_name=settings.cloudinary_cloud_name,
+        api_key=settings.cloudinary_api_key,
+        api_secret=settings.cloudinary_api_secret
+    )
+    _configured = True
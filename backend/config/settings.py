@@ -0,0 +1,120 @@
+import os
+from dataclasses import dataclass, fields
+
+from dotenv import load_dotenv
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Every setting the backend reads, loaded from the environment once.
+
+    Each field is read from the upper-cased environment variable of the same
+    name (mongodb_uri <- MONGODB_URI) and falls back to the default below.
+    """
+
+    # MongoDB
+    mongodb_uri: str | None = None
+    mongodb_db: str = "StreetVoice"
+    mongodb_max_pool_size: int = 100
+    mongodb_min_pool_size: int = 0
+    mongodb_connect_timeout_ms: int = 5000
+    mongodb_server_selection_timeout_ms: int = 5000
+    mongodb_socket_timeout_ms: int = 20000
+    auto_create_indexes: bool = True
+    migration_lock_seconds: int = 600
+
+    # Auth
+    jwt_secret: str = "your_super_secret_key"
+    google_client_id: str | None = None
+    google_certs_url: str = "https://www.googleapis.com/oauth2/v1/certs"
+    principal_cache_ttl: int = 300
+    principal_cache_size: int = 10000
+    user_cache_ttl: int = 60
+    user_cache_size: int = 10000
+    bcrypt_workers: int = 2
+    bcrypt_max_pending: int = 32
+    password_rate_per_ip: int = 30
+    password_rate_per_email: int = 10
+    password_concurrency_per_key: int = 2
+
+    # Images
+    image_storage: str = "cloudinary"  # or "local"
+    image_storage_dir: str = "image_store"
+    public_base_url: str = "http://localhost:8000"
+    cloudinary_cloud_name: str | None = None
+    cloudinary_api_key: str | None = None
+    cloudinary_api_secret: str | None = None
+    max_image_edge: int = 1600
+    thumbnail_edge: int = 320
+    max_image_pixels: int = 50_000_000
+    image_workers: int = 2
+    upload_concurrency: int = 4
+    upload_queue_size: int = 100
+
+    # Reports
+    report_batch_window_ms: float = 5
+    report_batch_size: int = 100
+    idempotency_ttl_seconds: int = 86400
+    idempotency_lock_seconds: int = 60
+    max_bulk_reports: int = 10000
+    duplicate_radius_m: float = 50
+    duplicate_window_hours: float = 72
+
+    # Contact form
+    contact_rate_per_ip: int = 20  # per hour
+    contact_rate_per_email: int = 5  # per hour
+    contact_dedup_window_seconds: int = 3600
+    contact_batch_window_ms: float = 5
+    contact_batch_size: int = 100
+
+    # Gemini suggestions
+    google_gemini_api_key: str | None = None
+    gemini_base_url: str = "https://generativelanguage.googleapis.com"
+    gemini_timeout: float = 30
+    gemini_max_retries: int = 3
+    gemini_max_connections: int = 20
+    suggestion_cache_ttl: int = 86400
+    suggestion_cache_size: int = 2048
+    suggestion_workers: int = 2
+    suggestion_queue: str = "memory"  # or "mongo"
+    suggestion_queue_size: int = 1000
+    suggestion_daily_budget: int = 500
+
+    # Caching and events
+    state_backend: str = "local"  # "local", "redis" or "mongo"
+    response_cache_backend: str = "memory"  # "memory", "redis" or "off"
+    response_cache_ttl: int = 30
+    response_cache_size: int = 2048
+    tile_cache_ttl: int = 300
+    redis_url: str = "redis://localhost:6379/0"
+    events_source: str = "local"  # or "changestream"
+    events_buffer: int = 64
+    events_max_subscribers: int = 10000
+
+    # Observability
+    log_level: str = "INFO"
+    log_format: str = "json"
+    metrics_token: str | None = None
+    profiling_enabled: bool = False
+    profiling_token: str | None = None
+    profiling_interval: float = 0.001
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        values = {}
+        for field in fields(cls):
+            raw = os.getenv(field.name.upper())
+            if raw is None:
+                continue
+            if field.type is bool:
+                values[field.name] = raw.strip().lower() in ("true", "1", "yes")
+            elif field.type in (int, float):
+                values[field.name] = field.type(raw)
+            else:
+                values[field.name] = raw
+        return cls(**values)
+
+
+# .env is read here and nowhere else
+load_dotenv()
+settings = Settings.from_env()
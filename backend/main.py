@@ -1,13 +1,48 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from models import user
 from routes.auth import router as auth_router
 from routes import contact
 from routes import report_issue
 from routes import suggestion
+from routes import images
+from routes import admin
+from routes import stats
+from routes import tiles
+from routes import metrics
+from routes import events
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
+from models import db, indexes, ingest, jobs, profiling, shared_state, suggestion as suggestion_client
+from models import events as report_events
+from models.batch_writer import report_writer
+from models.contact import contact_writer
+from models.metrics import MetricsMiddleware
+from config.logging_config import configure_logging, stop_logging
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Shared MongoDB client and background image upload/suggestion workers
+    configure_logging()
+    db.connect()
+    shared_state.warn_process_local_settings()
+    if indexes.AUTO_CREATE_INDEXES:
+        await indexes.migrate_once()
+    await ingest.start_workers()
+    await jobs.start_workers()
+    await report_events.start_watcher()
+    yield
+    await report_events.stop_watcher()
+    await jobs.stop_workers()
+    await report_writer.close()
+    await contact_writer.close()
+    await ingest.stop_workers()
+    await suggestion_client.close_client()
+    await db.close()
+    stop_logging()
 
 # Create FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -17,11 +52,27 @@ app.add_middleware(
     allow_headers=["*"],         # Allow all headers
 )
 
+# Per-route latency, in-flight and error metrics, served at /metrics
+app.add_middleware(MetricsMiddleware)
+
+if profiling.PROFILING_ENABLED:
+    @app.middleware("http")
+    async def profile(request: Request, call_next):
+        if profiling.wants_profile(request):
+            return await profiling.profile_request(request, call_next)
+        return await call_next(request)
+
 # Register routers with prefixes
 app.include_router(auth_router)
 app.include_router(contact.router)
 app.include_router(report_issue.router)
 app.include_router(suggestion.router)  
+app.include_router(images.router)
+app.include_router(admin.router)
+app.include_router(stats.router)
+app.include_router(tiles.router)
+app.include_router(metrics.router)
+app.include_router(events.router)
 @app.get("/")
 def root():
     return {"message": "StreetVoice Backend is running!"}
@@ -0,0 +1,81 @@
+import asyncio
+
+from pymongo.errors import BulkWriteError, WriteError
+
+from config.settings import settings
+from models.db import issues_collection
+
+# New reports are buffered for up to this long (or until the batch is full)
+# and written with one insert_many; 0 writes each report on its own
+REPORT_BATCH_WINDOW_MS = settings.report_batch_window_ms
+REPORT_BATCH_SIZE = settings.report_batch_size
+
+
+class BatchWriter:
+    """Coalesces concurrent inserts into one insert_many per flush window.
+
+    insert() resolves once the batch holding the document has been written,
+    so callers are only acknowledged after their document is stored. A
+    failing document fails only its own caller (the write is unordered).
+    """
+
+    def __init__(self, collection, max_batch: int, window_ms: float):
+        self._collection = collection  # callable returning the collection
+        self.max_batch = max_batch
+        self.window = window_ms / 1000
+        self._pending: list[tuple[dict, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._flushes: set[asyncio.Task] = set()
+
+    async def insert(self, doc: dict):
+        """Insert `doc` and return its _id."""
+        if self.window <= 0:
+            return (await self._collection().insert_one(doc)).inserted_id
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((doc, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush_now()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush_now)
+        return await future
+
+    def _flush_now(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._write(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _write(self, batch: list[tuple[dict, asyncio.Future]]):
+        failed = {}
+        try:
+            await self._collection().insert_many([doc for doc, _ in batch], ordered=False)
+        except BulkWriteError as e:
+            failed = {error["index"]: error for error in e.details.get("writeErrors", [])}
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for index, (doc, future) in enumerate(batch):
+            if future.done():
+                continue  # the caller went away; the document is written regardless
+            if index in failed:
+                error = failed[index]
+                future.set_exception(WriteError(error.get("errmsg"), error.get("code"), error))
+            else:
+                future.set_result(doc["_id"])
+
+    async def close(self):
+        # Write out whatever is still buffered
+        self._flush_now()
+        await asyncio.gather(*self._flushes, return_exceptions=True)
+
+
+report_writer = BatchWriter(issues_collection, REPORT_BATCH_SIZE, REPORT_BATCH_WINDOW_MS)
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+
+from bson import ObjectId
+from pymongo import UpdateMany
+
+from config.settings import settings
+from models.categories import category_to_department
+from models.db import issues_collection
+
+logger = logging.getLogger(__name__)
+
+# Largest number of reports one bulk request may touch
+MAX_BULK_REPORTS = settings.max_bulk_reports
+# Deletes sent at once by delete_reports
+DELETE_CONCURRENCY = 50
+
+# Fields the report hooks need from the pre-write documents
+_HOOK_FIELDS = {"tags": 1, "status": 1, "reported_at": 1, "geo": 1, "user_id": 1}
+
+
+class TooManyReports(Exception):
+    pass
+
+
+def department_categories(department: str) -> list[str]:
+    return [tag for tag, dept in category_to_department.items() if dept == department]
+
+
+async def select_reports(categories: list[str], ids: list[str] = None, filter_query: dict = None):
+    """Load the targeted reports in one query and sort out the ones the admin may not touch.
+
+    Returns (allowed reports, {report id: result}) where the second dict holds
+    "invalid_id", "not_found" and "forbidden" items.
+    """
+    results = {}
+    if ids is not None:
+        object_ids = []
+        for raw in ids:
+            try:
+                object_ids.append(ObjectId(raw))
+            except Exception:
+                results[raw] = "invalid_id"
+        query = {"_id": {"$in": object_ids}}
+    else:
+        # A filter only ever matches the admin's own categories
+        query = {"$and": [filter_query, {"tags": {"$in": categories}}]}
+
+    reports = await issues_collection().find(query, _HOOK_FIELDS).limit(MAX_BULK_REPORTS + 1).to_list()
+    if len(reports) > MAX_BULK_REPORTS:
+        raise TooManyReports(f"More than {MAX_BULK_REPORTS} reports match")
+
+    allowed_categories = set(categories)
+    allowed = []
+    for report in reports:
+        if report.get("tags") in allowed_categories:
+            allowed.append(report)
+        else:
+            results[str(report["_id"])] = "forbidden"
+    if ids is not None:
+        found = {str(report["_id"]) for report in reports}
+        for raw in ids:
+            if raw not in found and raw not in results:
+                results[raw] = "not_found"
+    return allowed, results
+
+
+async def update_status(reports: list[dict], new_status: str):
+    """Set `new_status` on `reports` with one bulk_write.
+
+    Returns (updated reports as they were before the write, {report id: result}).
+    """
+    results = {}
+    groups: dict[str, list] = {}
+    for report in reports:
+        if report.get("status") == new_status:
+            results[str(report["_id"])] = "unchanged"
+        else:
+            groups.setdefault(report.get("status"), []).append(report["_id"])
+    changed = [report for report in reports if report.get("status") != new_status]
+    if not changed:
+        return [], results
+
+    # One UpdateMany per previous status; matching on it keeps the hooks'
+    # view of the old status correct if a report changed since we read it.
+    # The write id marks the documents this call actually modified.
+    write_id = ObjectId()
+    outcome = await issues_collection().bulk_write(
+        [
+            UpdateMany(
+                {"_id": {"$in": report_ids}, "status": old_status},
+                {"$set": {"status": new_status, "status_write_id": write_id}},
+            )
+            for old_status, report_ids in groups.items()
+        ],
+        ordered=False,
+    )
+    if outcome.modified_count < len(changed):
+        # Some reports changed status meanwhile, possibly to new_status by
+        # someone else; only the ones carrying our write id were updated here
+        written = {
+            doc["_id"] for doc in await issues_collection().find(
+                {"_id": {"$in": [report["_id"] for report in changed]}, "status_write_id": write_id}, {"_id": 1}
+            ).to_list()
+        }
+        for report in changed:
+            if report["_id"] not in written:
+                results[str(report["_id"])] = "conflict"
+        changed = [report for report in changed if report["_id"] in written]
+
+    for report in changed:
+        results[str(report["_id"])] = "updated"
+    return changed, results
+
+
+async def _delete_one(report_id: ObjectId) -> bool:
+    outcome = await issues_collection().delete_one({"_id": report_id})
+    return outcome.deleted_count == 1
+
+
+async def delete_reports(reports: list[dict]):
+    """Delete `reports`, one delete per id.
+
+    Returns (reports this call deleted, {report id: result}). Per-id deletes
+    show which reports were actually removed here, so one deleted meanwhile
+    by another request is "not_found" and its hooks don't run twice.
+    """
+    deleted, results = [], {}
+    for start in range(0, len(reports), DELETE_CONCURRENCY):
+        batch = reports[start:start + DELETE_CONCURRENCY]
+        outcomes = await asyncio.gather(*(_delete_one(report["_id"]) for report in batch), return_exceptions=True)
+        for report, outcome in zip(batch, outcomes):
+            if isinstance(outcome, Exception):
+                logger.warning("Could not delete report %s", report["_id"], exc_info=outcome)
+                results[str(report["_id"])] = "failed"
+            elif outcome:
+                deleted.append(report)
+                results[str(report["_id"])] = "deleted"
+            else:
+                results[str(report["_id"])] = "not_found"
+    return deleted, results
@@ -0,0 +1,28 @@
+# Report category (stored in the 'tags' field) -> responsible department
+category_to_department = {
+    "Water Leakage / Issues": "Water Supply Department",
+    "Electricity Problem": "Electricity Department",
+    "Road Damage / Potholes": "Public Works Department (PWD)",
+    "Garbage / Waste": "Sanitation Department",
+    "Street Lights": "Municipal Electrical Department",
+    "Sewer / Drainage Issues": "Drainage Department / Jal Nigam",
+    "Tree Fall / Greenery": "Horticulture Department",
+    "Noise Complaint": "Pollution Control Board / Police",
+    "Encroachment": "Municipal Enforcement Department",
+    "Public Safety": "Police Department",
+    "Construction Debris": "Urban Planning or PWD",
+    "Traffic Light Issue": "Traffic Control Department",
+    "Illegal Parking": "Traffic Police Department",
+    "Stray Animals": "Animal Control Department / Municipal Corp",
+    "Water Tanker Request": "Water Supply / Jal Board",
+    "Fogging / Mosquito Issue": "Health Department / Municipal Health Wing",
+    "Broken Public Bench / Property": "Municipal Maintenance Department",
+    "Public Toilet Unclean": "Sanitation / Urban Hygiene Department",
+    "Air Pollution": "State Pollution Control Board",
+    "Noise Pollution (Religious/Events)": "Local Administration + Police",
+    "Construction Without Permit": "Urban Planning / Building Dept.",
+    "Missing Manhole Cover": "Drainage / Sewer Department",
+    "Slum/Unplanned Construction": "Slum Clearance Board / Town Planning",
+    "Overloaded Garbage Bin": "Waste Collection Unit",
+    "Street Vendor Obstruction": "Anti-Encroachment Cell"
+}
@@ -0,0 +1,84 @@
+import hashlib
+import time
+from datetime import datetime
+
+from pymongo import WriteConcern
+from pymongo.errors import WriteError
+
+from config.settings import settings
+from models.batch_writer import BatchWriter
+from models.cache import TTLCache
+from models.db import get_db
+from models.ratelimit import rate_limiter
+
+# Submissions per hour from one client IP / for one email address
+CONTACT_RATE_PER_IP = settings.contact_rate_per_ip
+CONTACT_RATE_PER_EMAIL = settings.contact_rate_per_email
+# The same message from the same email within this window is stored once
+CONTACT_DEDUP_WINDOW_SECONDS = settings.contact_dedup_window_seconds
+# Messages are buffered like new reports and written with one insert_many
+CONTACT_BATCH_WINDOW_MS = settings.contact_batch_window_ms
+CONTACT_BATCH_SIZE = settings.contact_batch_size
+
+DUPLICATE_KEY = 11000
+
+_ip_limiter = rate_limiter("contact_ip", CONTACT_RATE_PER_IP, per=3600)
+_email_limiter = rate_limiter("contact_email", CONTACT_RATE_PER_EMAIL, per=3600)
+# Fingerprints stored recently by this process, so floods of one message
+# are dropped without a round trip
+_recent = TTLCache(maxsize=100000, ttl=CONTACT_DEDUP_WINDOW_SECONDS)
+
+
+def contact_collection():
+    # Acknowledged by the primary without waiting for the journal, so a
+    # submission never waits on an fsync
+    return get_db().get_collection("contact_messages", write_concern=WriteConcern(w=1, j=False))
+
+
+contact_writer = BatchWriter(contact_collection, CONTACT_BATCH_SIZE, CONTACT_BATCH_WINDOW_MS)
+
+
+async def check_rate(ip: str, email: str):
+    # Raises RateLimited
+    await _ip_limiter.acquire(ip)
+    await _email_limiter.acquire(email.lower())
+
+
+def message_fingerprint(email: str, message: str) -> str:
+    # Case and whitespace changes don't make a message new
+    normalized = " ".join(message.lower().split())
+    return hashlib.sha256(f"{email.lower()}\0{normalized}".encode()).hexdigest()
+
+
+async def submit(name: str, email: str, message: str, ip: str) -> bool:
+    """Store a contact message; returns False when it repeats a recent one.
+
+    The unique dedup_key (fingerprint plus dedup window number) catches
+    repeats sent to other workers, and repeats within this process are
+    caught before any write.
+    """
+    fingerprint = message_fingerprint(email, message)
+    if _recent.get(fingerprint):
+        return False
+    _recent.set(fingerprint, True)
+
+    window = int(time.time() // CONTACT_DEDUP_WINDOW_SECONDS)
+    try:
+        await contact_writer.insert({
+            "name": name,
+            "email": email,
+            "email_lc": email.lower(),
+            "message": message,
+            "ip": ip,
+            "received_at": datetime.utcnow(),
+            "dedup_key": f"{fingerprint}:{window}",
+        })
+    except WriteError as e:
+        if e.code == DUPLICATE_KEY:
+            return False
+        _recent.pop(fingerprint)
+        raise
+    except BaseException:
+        _recent.pop(fingerprint)
+        raise
+    return True
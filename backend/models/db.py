@@ -1,16 +1,54 @@
-import os
-from pymongo import MongoClient
-from dotenv import load_dotenv
+from pymongo import AsyncMongoClient
 
-# Load environment variables
-load_dotenv()
+from config.settings import settings
+from models.metrics import MongoCommandListener
 
 # MongoDB connection string
-MONGO_URI = os.getenv("MONGODB_URI")
+MONGO_URI = settings.mongodb_uri
+DB_NAME = settings.mongodb_db
+
+# Connection pool tuning
+MONGODB_MAX_POOL_SIZE = settings.mongodb_max_pool_size
+MONGODB_MIN_POOL_SIZE = settings.mongodb_min_pool_size
+MONGODB_CONNECT_TIMEOUT_MS = settings.mongodb_connect_timeout_ms
+MONGODB_SERVER_SELECTION_TIMEOUT_MS = settings.mongodb_server_selection_timeout_ms
+MONGODB_SOCKET_TIMEOUT_MS = settings.mongodb_socket_timeout_ms
+
+# One client (and so one connection pool) per worker process
+_client: AsyncMongoClient | None = None
+
+
+def connect() -> AsyncMongoClient:
+    global _client
+    if _client is None:
+        _client = AsyncMongoClient(
+            MONGO_URI,
+            maxPoolSize=MONGODB_MAX_POOL_SIZE,
+            minPoolSize=MONGODB_MIN_POOL_SIZE,
+            connectTimeoutMS=MONGODB_CONNECT_TIMEOUT_MS,
+            serverSelectionTimeoutMS=MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+            socketTimeoutMS=MONGODB_SOCKET_TIMEOUT_MS,
+            # Per-command timings for /metrics
+            event_listeners=[MongoCommandListener()],
+        )
+    return _client
+
+
+async def close():
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+def get_db():
+    return connect()[DB_NAME]
 
-# Connect to MongoDB
-client = MongoClient(MONGO_URI)
-db = client["StreetVoice"]  # Replace with your actual database name
 
 # Collections
-users = db["users"]
+def users_collection():
+    return get_db()["users"]
+
+
+def issues_collection():
+    return get_db()["reported_issues"]
@@ -0,0 +1,183 @@
+import asyncio
+import json
+import logging
+from collections import deque
+from contextlib import contextmanager
+
+from config.settings import settings
+from models.categories import category_to_department
+from models.db import issues_collection
+
+logger = logging.getLogger(__name__)
+
+# "local": the report hooks publish in-process (each worker only sees its own
+# writes). "changestream": every worker tails a Mongo change stream on
+# reported_issues instead, so events reach clients on any worker (needs a
+# replica set; deletes need pre-images, MongoDB 6+).
+EVENTS_SOURCE = settings.events_source
+# Events kept per subscriber; a slower client loses the oldest and is told to refetch
+EVENTS_BUFFER = settings.events_buffer
+EVENTS_MAX_SUBSCRIBERS = settings.events_max_subscribers
+
+_channels: dict[str, set["Subscriber"]] = {}
+_subscriber_count = 0
+_watcher: asyncio.Task | None = None
+
+
+class TooManySubscribers(Exception):
+    pass
+
+
+class Subscriber:
+    # A bounded buffer and a wakeup flag; no task or queue per connection
+    __slots__ = ("buffer", "dropped", "ready")
+
+    def __init__(self):
+        self.buffer: deque[str] = deque(maxlen=EVENTS_BUFFER)
+        self.dropped = 0
+        self.ready = asyncio.Event()
+
+    def push(self, message: str):
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append(message)
+        self.ready.set()
+
+    async def next_batch(self, timeout: float) -> tuple[list[str], int]:
+        """Wait up to `timeout` for events; returns (messages, dropped since last call)."""
+        if not self.buffer:
+            self.ready.clear()
+            try:
+                await asyncio.wait_for(self.ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        messages = list(self.buffer)
+        self.buffer.clear()
+        dropped, self.dropped = self.dropped, 0
+        return messages, dropped
+
+
+def user_channel(email: str) -> str:
+    return f"user:{email}"
+
+
+def department_channel(department: str) -> str:
+    return f"department:{department}"
+
+
+def has_capacity() -> bool:
+    return _subscriber_count < EVENTS_MAX_SUBSCRIBERS
+
+
+@contextmanager
+def subscribe(channels: list[str]):
+    global _subscriber_count
+    if not has_capacity():
+        raise TooManySubscribers()
+    subscriber = Subscriber()
+    _subscriber_count += 1
+    for channel in channels:
+        _channels.setdefault(channel, set()).add(subscriber)
+    try:
+        yield subscriber
+    finally:
+        _subscriber_count -= 1
+        for channel in channels:
+            members = _channels.get(channel)
+            if members is not None:
+                members.discard(subscriber)
+                if not members:
+                    del _channels[channel]
+
+
+def sse_message(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def publish(event: str, report: dict, **fields):
+    """Send a report event to its owner's and its department's subscribers."""
+    channels = [user_channel(report.get("user_id"))]
+    department = category_to_department.get(report.get("tags"))
+    if department:
+        channels.append(department_channel(department))
+
+    subscribers = set()
+    for channel in channels:
+        subscribers.update(_channels.get(channel, ()))
+    if not subscribers:
+        return
+
+    # Serialized once, shared by every subscriber
+    message = sse_message(event, {
+        "report_id": str(report["_id"]),
+        "tags": report.get("tags"),
+        "status": report.get("status"),
+        **fields,
+    })
+    for subscriber in subscribers:
+        subscriber.push(message)
+
+
+def publish_local(event: str, report: dict, **fields):
+    # Called from the report hooks; the change stream publishes instead when enabled
+    if EVENTS_SOURCE == "local":
+        publish(event, report, **fields)
+
+
+async def _watch_changes():
+    collection = issues_collection()
+    try:
+        # Lets delete events carry the deleted document (MongoDB 6+)
+        await collection.database.command(
+            "collMod", collection.name, changeStreamPreAndPostImages={"enabled": True}
+        )
+    except Exception as e:
+        logger.warning("Could not enable change stream pre-images, deletes won't be pushed: %s", e)
+
+    pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace", "delete"]}}}]
+    resume_token = None
+    while True:
+        try:
+            stream = await collection.watch(
+                pipeline,
+                full_document="updateLookup",
+                full_document_before_change="whenAvailable",
+                resume_after=resume_token,
+            )
+            async with stream:
+                async for change in stream:
+                    resume_token = change["_id"]
+                    _publish_change(change)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Report change stream failed, restarting")
+            await asyncio.sleep(1)
+
+
+def _publish_change(change: dict):
+    operation = change["operationType"]
+    if operation == "insert":
+        publish("report_created", change["fullDocument"], reported_at=change["fullDocument"].get("reported_at"))
+    elif operation in ("update", "replace"):
+        updated = change.get("updateDescription", {}).get("updatedFields", {})
+        report = change.get("fullDocument")
+        if report and (operation == "replace" or "status" in updated):
+            before = change.get("fullDocumentBeforeChange") or {}
+            publish("report_status_changed", report, previous_status=before.get("status"))
+    elif operation == "delete" and change.get("fullDocumentBeforeChange"):
+        publish("report_deleted", change["fullDocumentBeforeChange"])
+
+
+async def start_watcher():
+    global _watcher
+    if EVENTS_SOURCE == "changestream" and _watcher is None:
+        _watcher = asyncio.create_task(_watch_changes())
+
+
+async def stop_watcher():
+    global _watcher
+    if _watcher is not None:
+        _watcher.cancel()
+        await asyncio.gather(_watcher, return_exceptions=True)
+        _watcher = None
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+from config.settings import settings
+
+# A new report is treated as a duplicate of an open report with the same
+# category within this many metres and hours
+DUPLICATE_RADIUS_M = settings.duplicate_radius_m
+DUPLICATE_WINDOW_HOURS = settings.duplicate_window_hours
+
+# Largest radius /reports/near accepts
+MAX_NEAR_RADIUS_M = 50000
+
+
+def geo_point(latitude: float, longitude: float) -> dict:
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError("Latitude/longitude out of range")
+    # GeoJSON order is [longitude, latitude]
+    return {"type": "Point", "coordinates": [longitude, latitude]}
+
+
+def parse_bbox(bbox: str) -> dict:
+    # "minLng,minLat,maxLng,maxLat" -> GeoJSON polygon for $geoWithin
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(part) for part in bbox.split(","))
+    except ValueError:
+        raise ValueError("bbox must be minLng,minLat,maxLng,maxLat")
+    if not (-180 <= min_lng < max_lng <= 180 and -90 <= min_lat < max_lat <= 90):
+        raise ValueError("bbox is out of range or empty")
+    return {
+        "type": "Polygon",
+        "coordinates": [[
+            [min_lng, min_lat], [max_lng, min_lat], [max_lng, max_lat], [min_lng, max_lat], [min_lng, min_lat]
+        ]],
+    }
+
+
+async def find_duplicate(collection, tag: str, point: dict, reported_at: datetime) -> dict | None:
+    """Closest open report of the same category near `point`, if any."""
+    return await collection.find_one(
+        {
+            "geo": {"$nearSphere": {"$geometry": point, "$maxDistance": DUPLICATE_RADIUS_M}},
+            "tags": tag,
+            "reported_at": {"$gte": reported_at - timedelta(hours=DUPLICATE_WINDOW_HOURS)},
+            "status": {"$ne": "resolved"},
+        },
+        {"cluster_id": 1},
+    )
+
+
+def cluster_fields(duplicate: dict) -> dict:
+    # Clusters are keyed by their first report
+    return {
+        "cluster_id": duplicate.get("cluster_id", duplicate["_id"]),
+        "duplicate_of": duplicate["_id"],
+    }
+
+
+async def record_duplicate(collection, cluster_id):
+    # The first report keeps a running count of reports attached to it
+    await collection.update_one({"_id": cluster_id}, {"$inc": {"duplicate_count": 1}})
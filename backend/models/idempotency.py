@@ -0,0 +1,89 @@
+import hashlib
+from datetime import datetime, timedelta
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from config.settings import settings
+from models.db import get_db
+
+# How long a key (and the response stored for it) is remembered; Mongo's TTL
+# monitor removes older keys
+IDEMPOTENCY_TTL_SECONDS = settings.idempotency_ttl_seconds
+# A key still "pending" after this long belonged to a request that died,
+# and the next retry may take it over
+IDEMPOTENCY_LOCK_SECONDS = settings.idempotency_lock_seconds
+
+
+class IdempotencyInProgress(Exception):
+    pass
+
+
+class IdempotencyMismatch(Exception):
+    pass
+
+
+def idempotency_collection():
+    return get_db()["idempotency_keys"]
+
+
+def scoped_key(user: str, key: str) -> str:
+    # Keys only need to be unique per user
+    return f"{user}:{key.strip()}"
+
+
+def fingerprint(*parts) -> str:
+    # Identifies the request body, so a reused key with a different body is rejected
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else repr(part).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+async def begin(key: str, request_fingerprint: str) -> dict | None:
+    """Claim `key` for this request.
+
+    Returns None when the caller should process the request, or the stored
+    response of an earlier request with the same key. Raises
+    IdempotencyInProgress while that earlier request is still running and
+    IdempotencyMismatch when the key was used for a different body.
+    """
+    now = datetime.utcnow()
+    try:
+        await idempotency_collection().insert_one({
+            "_id": key, "state": "pending", "fingerprint": request_fingerprint,
+            "created_at": now, "locked_at": now,
+        })
+        return None
+    except DuplicateKeyError:
+        pass
+
+    existing = await idempotency_collection().find_one({"_id": key})
+    if existing is None:
+        # Expired between the insert and the read; just try again
+        return await begin(key, request_fingerprint)
+    if existing["fingerprint"] != request_fingerprint:
+        raise IdempotencyMismatch()
+    if existing["state"] == "done":
+        return existing["response"]
+
+    taken_over = await idempotency_collection().find_one_and_update(
+        {"_id": key, "state": "pending", "locked_at": {"$lt": now - timedelta(seconds=IDEMPOTENCY_LOCK_SECONDS)}},
+        {"$set": {"locked_at": now}},
+        return_document=ReturnDocument.AFTER,
+    )
+    if taken_over is None:
+        raise IdempotencyInProgress()
+    return None
+
+
+async def complete(key: str, response: dict):
+    await idempotency_collection().update_one(
+        {"_id": key}, {"$set": {"state": "done", "response": response}}
+    )
+
+
+async def abandon(key: str):
+    # The request failed before doing anything durable; let a retry run it again
+    await idempotency_collection().delete_one({"_id": key, "state": "pending"})
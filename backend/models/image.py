@@ -0,0 +1,83 @@
+from io import BytesIO
+
+from config.settings import settings
+
+# Longest edge of the stored image and of the list thumbnail, in pixels
+MAX_IMAGE_EDGE = settings.max_image_edge
+THUMBNAIL_EDGE = settings.thumbnail_edge
+# Reject anything larger than this before decoding (decompression bombs)
+MAX_IMAGE_PIXELS = settings.max_image_pixels
+
+
+def _pillow():
+    # Imported on first use, so workers that never handle an image don't pay
+    # for Pillow at startup
+    from PIL import Image, ImageOps
+
+    # Pillow's own guard raises for images over twice this size
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+    return Image, ImageOps
+
+
+class ImageTooLarge(ValueError):
+    pass
+
+
+def _encode_jpeg(image, quality: int) -> bytes:
+    # No optimize=True: the extra Huffman pass costs more CPU than the few
+    # percent of bytes it saves
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def draft_to_edge(image, max_edge: int):
+    # draft() only reduces while both sides stay at least the requested size,
+    # so ask for the image's own aspect ratio at the target long edge (a
+    # square box would leave 4:3 photos at full size)
+    width, height = image.size
+    scale = max_edge / max(width, height)
+    if scale < 1:
+        image.draft("RGB", (max(1, round(width * scale)), max(1, round(height * scale))))
+
+
+def normalize_image(
+    data: bytes,
+    max_edge: int = MAX_IMAGE_EDGE,
+    thumbnail_edge: int = THUMBNAIL_EDGE,
+    quality: int = 70,
+) -> tuple[bytes, bytes]:
+    """Decode an uploaded photo once and return (image, thumbnail) JPEG bytes.
+
+    The image is upright (EXIF orientation applied) and its long edge is
+    capped at `max_edge`; the thumbnail is derived from the already reduced
+    image rather than decoding the original again.
+    """
+    Image, ImageOps = _pillow()
+    image = Image.open(BytesIO(data))
+
+    # Only the header has been read so far, so this check is cheap
+    width, height = image.size
+    if width * height > MAX_IMAGE_PIXELS:
+        raise ImageTooLarge(f"Image is too large ({width}x{height})")
+
+    # For JPEG, let libjpeg scale by 1/2, 1/4 or 1/8 while decoding
+    if image.format == "JPEG":
+        draft_to_edge(image, max_edge)
+
+    image = ImageOps.exif_transpose(image)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+
+    # thumbnail() uses reduce() for any integer step draft() left over, then
+    # resamples the rest. BILINEAR is a fraction of LANCZOS's cost and the
+    # difference doesn't survive quality-70 JPEG at these sizes
+    if max(image.size) > max_edge:
+        image.thumbnail((max_edge, max_edge), Image.BILINEAR, reducing_gap=2.0)
+    image_bytes = _encode_jpeg(image, quality)
+
+    thumbnail = image.copy()
+    thumbnail.thumbnail((thumbnail_edge, thumbnail_edge), Image.BILINEAR, reducing_gap=2.0)
+    thumbnail_bytes = _encode_jpeg(thumbnail, quality)
+
+    return image_bytes, thumbnail_bytes
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+
+from pymongo import ASCENDING, DESCENDING, GEO2D, GEOSPHERE, TEXT, IndexModel
+from pymongo.errors import PyMongoError
+
+from config.settings import settings
+from models import db, shared_state, stats, tiles
+from models.idempotency import IDEMPOTENCY_TTL_SECONDS
+from models.search import backfill_location_keys
+
+logger = logging.getLogger(__name__)
+
+# Create/verify indexes when the app starts (disable if a separate migration job runs this)
+AUTO_CREATE_INDEXES = settings.auto_create_indexes
+
+INDEXES = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "reported_issues": [
+        # /all-reports filters and its (reported_at, _id) keyset sort
+        IndexModel(
+            [("status", ASCENDING), ("tags", ASCENDING), ("reported_at", DESCENDING), ("_id", DESCENDING)],
+            name="status_tags_reported_at_id",
+        ),
+        IndexModel([("reported_at", DESCENDING), ("_id", DESCENDING)], name="reported_at_id"),
+        # /my-reports
+        IndexModel(
+            [("user_id", ASCENDING), ("reported_at", DESCENDING), ("_id", DESCENDING)],
+            name="user_id_reported_at_id",
+        ),
+        # Location prefix search
+        IndexModel(
+            [("location_lc", ASCENDING), ("reported_at", DESCENDING), ("_id", DESCENDING)],
+            name="location_lc_reported_at_id",
+        ),
+        # /reports/near and duplicate detection at ingest
+        IndexModel(
+            [("geo", GEOSPHERE), ("tags", ASCENDING), ("reported_at", DESCENDING)],
+            name="geo_tags_reported_at",
+        ),
+        # Full-text search (only one text index is allowed per collection)
+        IndexModel(
+            [("tags", TEXT), ("location", TEXT), ("description", TEXT)],
+            name="search_text",
+        ),
+    ],
+    # Persistent suggestion precompute queue (SUGGESTION_QUEUE=mongo)
+    "suggestion_jobs": [
+        IndexModel([("status", ASCENDING), ("created_at", ASCENDING)], name="status_created_at"),
+    ],
+    # Report submission Idempotency-Keys, expired by Mongo's TTL monitor
+    "idempotency_keys": [
+        IndexModel([("created_at", ASCENDING)], name="created_at_ttl", expireAfterSeconds=IDEMPOTENCY_TTL_SECONDS),
+    ],
+    # Contact form: repeats are rejected by dedup_key, the admin listing
+    # pages newest first (optionally for one email)
+    "contact_messages": [
+        IndexModel([("dedup_key", ASCENDING)], name="dedup_key_unique", unique=True),
+        IndexModel([("email_lc", ASCENDING), ("_id", DESCENDING)], name="email_lc_id"),
+    ],
+    # Shared rate-limit counters, user cache entries and locks
+    # (STATE_BACKEND=mongo); reads also check expires_at
+    "shared_state": [
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    # Map tile cells, looked up by precision inside a tile's bounding box
+    "geo_cells": [
+        IndexModel([("loc", GEO2D), ("p", ASCENDING)], name="loc_p"),
+    ],
+}
+
+
+async def ensure_indexes() -> dict:
+    """Create any missing indexes and report which ones exist afterwards.
+
+    Returns {collection: {index_name: True/False}}. Failures (for example
+    duplicate emails blocking the unique index) are reported, not raised.
+    """
+    database = db.get_db()
+    report = {}
+    for collection_name, models in INDEXES.items():
+        collection = database[collection_name]
+        try:
+            await collection.create_indexes(models)
+        except PyMongoError as e:
+            logger.error("Index creation failed on %s: %s", collection_name, e)
+
+        existing = await collection.index_information()
+        report[collection_name] = {
+            model.document["name"]: model.document["name"] in existing for model in models
+        }
+        missing = [name for name, ok in report[collection_name].items() if not ok]
+        if missing:
+            logger.warning("Missing indexes on %s: %s", collection_name, ", ".join(missing))
+    return report
+
+
+def plan_stages(plan: dict) -> list[str]:
+    # Collect every stage name in an explain() plan tree
+    stages = []
+    if "stage" in plan:
+        stages.append(plan["stage"])
+    for key in ("inputStage", "queryPlan"):
+        if isinstance(plan.get(key), dict):
+            stages.extend(plan_stages(plan[key]))
+    for child in plan.get("inputStages", []):
+        stages.extend(plan_stages(child))
+    return stages
+
+
+async def migrate() -> dict:
+    # Indexes first, then data backfills that rely on them
+    report = await ensure_indexes()
+    backfilled = await backfill_location_keys(db.issues_collection())
+    if backfilled:
+        logger.info("Backfilled location_lc on %d reports", backfilled)
+    await stats.ensure_seeded()
+    await tiles.ensure_seeded()
+    return report
+
+
+async def migrate_once() -> dict | None:
+    # When several workers start together only one of them migrates; the
+    # others start serving right away instead of repeating the work
+    async with shared_state.exclusive("migrate", shared_state.MIGRATION_LOCK_SECONDS) as acquired:
+        if not acquired:
+            logger.info("Migration already running in another worker, skipping")
+            return None
+        return await migrate()
+
+
+if __name__ == "__main__":
+    # Run as a one-off migration: python -m models.indexes
+    async def _main():
+        from config.logging_config import configure_logging, stop_logging
+
+        configure_logging()
+        print(await migrate())
+        stop_logging()
+        await db.close()
+
+    asyncio.run(_main())
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from config.settings import settings
+from models.image import normalize_image
+from models.metrics import span
+from models.response_cache import ALL_REPORTS, invalidate, user_reports_tag
+from models.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+# Pipeline tuning (override through environment variables)
+IMAGE_WORKERS = settings.image_workers
+UPLOAD_CONCURRENCY = settings.upload_concurrency
+UPLOAD_QUEUE_SIZE = settings.upload_queue_size
+
+# Pillow releases the GIL while decoding/encoding, so a small thread pool
+# keeps CPU-bound work off the event loop without pickling image bytes.
+_image_pool = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="image")
+
+_upload_queue: asyncio.Queue | None = None
+_upload_workers: list[asyncio.Task] = []
+
+
+async def normalize_in_pool(data: bytes) -> tuple[bytes, bytes]:
+    # Returns (image, thumbnail) JPEG bytes, see models.image.normalize_image
+    loop = asyncio.get_running_loop()
+    with span("image.normalize"):
+        return await loop.run_in_executor(_image_pool, normalize_image, data)
+
+
+async def store_image(data: bytes) -> dict:
+    # Storage backends do blocking I/O, so run them in a worker thread
+    return await asyncio.to_thread(get_storage().put, data)
+
+
+async def enqueue_upload(collection, issue_id, image: bytes, thumbnail: bytes):
+    # Blocks the caller when the queue is full (backpressure)
+    if _upload_queue is None:
+        raise RuntimeError("Upload workers are not running")
+    await _upload_queue.put((collection, issue_id, image, thumbnail))
+
+
+async def _upload_worker():
+    while True:
+        collection, issue_id, image, thumbnail = await _upload_queue.get()
+        try:
+            stored, stored_thumbnail = await asyncio.gather(
+                store_image(image), store_image(thumbnail)
+            )
+            update = {
+                "image_url": stored["url"],
+                "image_key": stored["key"],
+                "thumbnail_url": stored_thumbnail["url"],
+                "image_status": "uploaded"
+            }
+        except Exception as e:
+            logger.exception("Image upload failed", extra={"report_id": str(issue_id)})
+            update = {"image_status": "failed", "image_error": str(e)}
+
+        try:
+            report = await collection.find_one_and_update(
+                {"_id": issue_id}, {"$set": update}, projection={"user_id": 1}
+            )
+            # Cached report lists still show the image as pending
+            if report:
+                await invalidate([ALL_REPORTS, user_reports_tag(report.get("user_id"))])
+        except Exception:
+            logger.exception("Error updating image state", extra={"report_id": str(issue_id)})
+        finally:
+            _upload_queue.task_done()
+
+
+async def start_workers():
+    global _upload_queue
+    if _upload_queue is not None:
+        return
+    _upload_queue = asyncio.Queue(maxsize=UPLOAD_QUEUE_SIZE)
+    for _ in range(UPLOAD_CONCURRENCY):
+        _upload_workers.append(asyncio.create_task(_upload_worker()))
+
+
+async def stop_workers(drain_timeout: float = 30.0):
+    global _upload_queue
+    if _upload_queue is None:
+        return
+    # Give in-flight uploads a chance to finish before shutting down
+    try:
+        await asyncio.wait_for(_upload_queue.join(), timeout=drain_timeout)
+    except asyncio.TimeoutError:
+        pass
+    for task in _upload_workers:
+        task.cancel()
+    await asyncio.gather(*_upload_workers, return_exceptions=True)
+    _upload_workers.clear()
+    _upload_queue = None
@@ -0,0 +1,167 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from config.settings import settings
+from models.db import get_db, issues_collection
+from models.suggestion import cached_suggestion, get_suggestion, save_suggestion
+
+logger = logging.getLogger(__name__)
+
+# Background suggestion precomputation for new reports
+SUGGESTION_WORKERS = settings.suggestion_workers
+# "memory" (lost on restart) or "mongo" (persistent, shared by all workers)
+SUGGESTION_QUEUE = settings.suggestion_queue
+SUGGESTION_QUEUE_SIZE = settings.suggestion_queue_size
+# Max Gemini calls per UTC day made by the workers (0 disables precomputation)
+SUGGESTION_DAILY_BUDGET = settings.suggestion_daily_budget
+# A Mongo job still "running" after this long is assumed abandoned
+SUGGESTION_JOB_LEASE = timedelta(minutes=10)
+SUGGESTION_POLL_SECONDS = 5
+
+_memory_queue: asyncio.Queue | None = None
+_wakeup = asyncio.Event()
+_workers: list[asyncio.Task] = []
+
+
+def jobs_collection():
+    return get_db()["suggestion_jobs"]
+
+
+def budget_collection():
+    return get_db()["suggestion_budget"]
+
+
+async def take_budget() -> bool:
+    # Atomically use one unit of today's budget; shared by every process
+    day = datetime.utcnow().strftime("%Y-%m-%d")
+    try:
+        await budget_collection().find_one_and_update(
+            {"_id": day, "used": {"$lt": SUGGESTION_DAILY_BUDGET}},
+            {"$inc": {"used": 1}},
+            upsert=True,
+        )
+        return True
+    except DuplicateKeyError:
+        # The upsert collided with today's exhausted counter
+        return False
+
+
+async def enqueue_suggestion(report_id):
+    if SUGGESTION_DAILY_BUDGET <= 0:
+        return
+    if SUGGESTION_QUEUE == "mongo":
+        now = datetime.utcnow()
+        await jobs_collection().update_one(
+            {"_id": report_id},
+            {"$setOnInsert": {"status": "pending", "attempts": 0, "created_at": now, "updated_at": now}},
+            upsert=True,
+        )
+        _wakeup.set()
+    elif _memory_queue is not None:
+        try:
+            _memory_queue.put_nowait(report_id)
+        except asyncio.QueueFull:
+            # The suggestion will simply be generated on demand instead
+            logger.warning("Suggestion queue full, skipping report", extra={"report_id": str(report_id)})
+
+
+async def _claim_mongo_job():
+    now = datetime.utcnow()
+    return await jobs_collection().find_one_and_update(
+        {"$or": [
+            {"status": "pending"},
+            {"status": "running", "updated_at": {"$lt": now - SUGGESTION_JOB_LEASE}},
+        ]},
+        {"$set": {"status": "running", "updated_at": now}, "$inc": {"attempts": 1}},
+        sort=[("created_at", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def _finish_mongo_job(report_id, status: str, error: str | None = None):
+    update = {"status": status, "updated_at": datetime.utcnow()}
+    if error:
+        update["error"] = error
+    await jobs_collection().update_one({"_id": report_id}, {"$set": update})
+
+
+async def precompute(report_id) -> str:
+    """Generate and store the suggestion for one report; returns the outcome."""
+    report = await issues_collection().find_one(
+        {"_id": report_id}, {"tags": 1, "location": 1, "description": 1, "suggestion": 1}
+    )
+    if not report:
+        return "missing"
+    if report.get("suggestion"):
+        return "done"
+
+    args = (report.get("tags", ""), report.get("location", ""), report.get("description", ""))
+    text = cached_suggestion(*args)
+    if text is None:
+        if not await take_budget():
+            return "over_budget"
+        text = await get_suggestion(*args)
+    await save_suggestion(report_id, text)
+    return "done"
+
+
+async def _memory_worker():
+    while True:
+        report_id = await _memory_queue.get()
+        try:
+            await precompute(report_id)
+        except Exception:
+            logger.exception("Suggestion precompute failed", extra={"report_id": str(report_id)})
+        finally:
+            _memory_queue.task_done()
+
+
+async def _mongo_worker():
+    while True:
+        job = None
+        try:
+            job = await _claim_mongo_job()
+            if job is None:
+                _wakeup.clear()
+                try:
+                    await asyncio.wait_for(_wakeup.wait(), timeout=SUGGESTION_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await _finish_mongo_job(job["_id"], await precompute(job["_id"]))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception("Suggestion job failed", extra={"report_id": str(job["_id"]) if job else None})
+            if job is not None:
+                try:
+                    await _finish_mongo_job(job["_id"], "failed", str(e))
+                except Exception:
+                    pass  # the lease expires and another worker retries it
+            await asyncio.sleep(1)
+
+
+async def start_workers():
+    global _memory_queue
+    if _workers or SUGGESTION_DAILY_BUDGET <= 0:
+        return
+    if SUGGESTION_QUEUE == "mongo":
+        worker = _mongo_worker
+    else:
+        _memory_queue = asyncio.Queue(maxsize=SUGGESTION_QUEUE_SIZE)
+        worker = _memory_worker
+    for _ in range(SUGGESTION_WORKERS):
+        _workers.append(asyncio.create_task(worker()))
+
+
+async def stop_workers():
+    global _memory_queue
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    _memory_queue = None
@@ -0,0 +1,193 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+from pymongo import monitoring
+
+from config.settings import settings
+
+# Optional bearer token required to scrape /metrics
+METRICS_TOKEN = settings.metrics_token
+
+# Upper bounds in seconds; requests and spans are mostly in the ms range
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry: list = []
+
+
+def _label_text(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, "") for name in self.labels)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key: tuple, value) -> list[str]:
+        return [f"{self.name}{_label_text(self.labels, key)} {value}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = buckets
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            # [per-bucket counts..., +Inf count, sum]
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[bisect.bisect_left(self.buckets, value)] += 1
+            state[-1] += value
+
+    def _render_value(self, key: tuple, state) -> list[str]:
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + ("+Inf",), state[:-1]):
+            cumulative += count
+            le = f'le="{bound}"'
+            lines.append(f"{self.name}_bucket{_label_text(self.labels, key, le)} {cumulative}")
+        lines.append(f"{self.name}_sum{_label_text(self.labels, key)} {state[-1]}")
+        lines.append(f"{self.name}_count{_label_text(self.labels, key)} {cumulative}")
+        return lines
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time from request start to the last response byte.",
+    ("method", "route", "status"),
+)
+# The route is only known after dispatch, so in-flight is per method
+REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being handled.", ("method",))
+REQUEST_ERRORS = Counter(
+    "http_request_errors_total", "Requests that ended in a 5xx or an unhandled exception.", ("method", "route"),
+)
+SPAN_LATENCY = Histogram("span_duration_seconds", "Duration of instrumented calls.", ("span",))
+SPAN_ERRORS = Counter("span_errors_total", "Instrumented calls that raised.", ("span",))
+
+
+@contextmanager
+def span(name: str):
+    # Time a block (sync or inside a coroutine) as span_duration_seconds{span=name}
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        SPAN_ERRORS.inc(span=name)
+        raise
+    finally:
+        SPAN_LATENCY.observe(time.perf_counter() - start, span=name)
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    # Every driver command as a "mongo.<command>" span
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        SPAN_LATENCY.observe(event.duration_micros / 1e6, span=f"mongo.{event.command_name}")
+
+    def failed(self, event):
+        SPAN_LATENCY.observe(event.duration_micros / 1e6, span=f"mongo.{event.command_name}")
+        SPAN_ERRORS.inc(span=f"mongo.{event.command_name}")
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, in-flight and error metrics per route.
+
+    Routes are labelled by their path template (/delete-report/{report_id}),
+    so label cardinality stays bounded; unmatched paths share one label.
+    Latency runs until the last body chunk, which covers streamed responses.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        status = 500
+        start = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc(method=method)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException:
+            status = 500
+            raise
+        finally:
+            REQUESTS_IN_FLIGHT.dec(method=method)
+            route = _route_template(scope)
+            REQUEST_LATENCY.observe(time.perf_counter() - start, method=method, route=route, status=status)
+            if status >= 500:
+                REQUEST_ERRORS.inc(method=method, route=route)
+
+
+def _route_template(scope) -> str:
+    # The router stores the matched route in the scope once it has dispatched
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def render() -> str:
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
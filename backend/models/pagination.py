@@ -0,0 +1,118 @@
+import base64
+import json
+from datetime import datetime
+
+from bson import ObjectId
+
+from models.cache import TTLCache
+
+# Reports are always listed newest first; _id breaks ties on reported_at
+REPORT_SORT = [("reported_at", -1), ("_id", -1)]
+
+# Totals are expensive on big filters, so they are cached briefly
+COUNT_CACHE_TTL = 30
+_count_cache = TTLCache(maxsize=512, ttl=COUNT_CACHE_TTL)
+
+
+def encode_cursor(reported_at: datetime, report_id: ObjectId) -> str:
+    payload = json.dumps({"t": reported_at.isoformat(), "id": str(report_id)})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> tuple[datetime, ObjectId]:
+    # Raises ValueError for anything that is not a cursor we issued
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["t"]), ObjectId(payload["id"])
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def after_cursor(filter_query: dict, token: str | None) -> dict:
+    # Restrict filter_query to reports strictly after the cursor position
+    if not token:
+        return filter_query
+    reported_at, report_id = decode_cursor(token)
+    keyset = {"$or": [
+        {"reported_at": {"$lt": reported_at}},
+        {"reported_at": reported_at, "_id": {"$lt": report_id}},
+    ]}
+    if not filter_query:
+        return keyset
+    return {"$and": [filter_query, keyset]}
+
+
+async def fetch_page(
+    collection,
+    filter_query: dict,
+    projection: dict,
+    limit: int,
+    cursor: str | None = None,
+    skip: int = 0,
+):
+    """Return (documents, next_cursor) for one page in REPORT_SORT order.
+
+    `skip` only exists for legacy ?page= clients; cursor pages cost the same
+    no matter how deep they are.
+    """
+    query = after_cursor(filter_query, cursor)
+    # Fetch one extra document to know whether another page exists
+    find = collection.find(query, projection).sort(REPORT_SORT)
+    if skip:
+        find = find.skip(skip)
+    docs = await find.limit(limit + 1).to_list()
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        last = docs[-1]
+        next_cursor = encode_cursor(last["reported_at"], last["_id"])
+    return docs, next_cursor
+
+
+def decode_id_cursor(token: str) -> ObjectId:
+    try:
+        return ObjectId(token)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+async def fetch_id_page(
+    collection,
+    filter_query: dict,
+    projection: dict,
+    limit: int,
+    cursor: str | None = None,
+    newest_first: bool = False,
+):
+    """Return (documents, next_cursor) for one page in _id order.
+
+    For collections without a better sort key; ObjectIds grow with creation
+    time, so pages are oldest first (newest first with `newest_first`) and
+    new documents never shift the pages a client is walking through.
+    """
+    query = dict(filter_query)
+    if cursor:
+        query["_id"] = {"$lt" if newest_first else "$gt": decode_id_cursor(cursor)}
+    find = collection.find(query, projection).sort("_id", -1 if newest_first else 1)
+    docs = await find.limit(limit + 1).to_list()
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = str(docs[-1]["_id"])
+    return docs, next_cursor
+
+
+async def cached_count(collection, filter_query: dict) -> int:
+    # Unfiltered totals come from collection metadata instead of a scan
+    if not filter_query:
+        return await collection.estimated_document_count()
+
+    key = (collection.name, repr(filter_query))
+    count = _count_cache.get(key)
+    if count is None:
+        count = await collection.count_documents(filter_query)
+        _count_cache.set(key, count)
+    return count
@@ -0,0 +1,55 @@
+import cProfile
+import io
+import pstats
+
+from fastapi.responses import HTMLResponse, PlainTextResponse
+
+from config.settings import settings
+
+# Off by default: when enabled, any request carrying ?profile=1 (and the
+# PROFILING_TOKEN, if one is set) is profiled and answered with the report
+# instead of its normal response
+PROFILING_ENABLED = settings.profiling_enabled
+PROFILING_TOKEN = settings.profiling_token
+PROFILING_INTERVAL = settings.profiling_interval
+
+
+def wants_profile(request) -> bool:
+    if request.query_params.get("profile") not in ("1", "true"):
+        return False
+    return not PROFILING_TOKEN or request.headers.get("X-Profile-Token") == PROFILING_TOKEN
+
+
+async def profile_request(request, call_next):
+    try:
+        # Sampling profiler that follows awaits; preferred when installed
+        from pyinstrument import Profiler
+    except ImportError:
+        Profiler = None
+
+    if Profiler is not None:
+        profiler = Profiler(interval=PROFILING_INTERVAL, async_mode="enabled")
+        profiler.start()
+        try:
+            await _consume(await call_next(request))
+        finally:
+            profiler.stop()
+        return HTMLResponse(profiler.output_html())
+
+    # Fallback: deterministic cProfile of the event loop thread while the
+    # request runs (includes other requests served concurrently)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        await _consume(await call_next(request))
+    finally:
+        profiler.disable()
+    output = io.StringIO()
+    pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(50)
+    return PlainTextResponse(output.getvalue())
+
+
+async def _consume(response):
+    # Run the whole handler, including a streamed body
+    async for _ in response.body_iterator:
+        pass
@@ -0,0 +1,103 @@
+# Limiters are only used from the event loop thread, so they need no locks
+import logging
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from models import shared_state
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__("Too many requests")
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Per-key token bucket: `rate` requests per `per` seconds, bursting to `burst`.
+
+    Only the most recently used `max_keys` buckets are kept, so memory stays
+    bounded under traffic from many distinct IPs or emails.
+    """
+
+    def __init__(self, rate: float, per: float = 60.0, burst: int | None = None, max_keys: int = 100000):
+        self.refill = rate / per
+        self.burst = burst or max(1, int(rate))
+        self.max_keys = max_keys
+        self._buckets: OrderedDict = OrderedDict()
+
+    def hit(self, key: str):
+        # Raises RateLimited when the key has no tokens left
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.refill)
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            raise RateLimited(retry_after=(1 - tokens) / self.refill)
+        self._buckets[key] = (tokens - 1, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+    async def acquire(self, key: str):
+        self.hit(key)
+
+
+class SharedRateLimiter:
+    """`rate` requests per `per` seconds per key, counted in the shared state
+    backend so every worker enforces one limit.
+
+    Uses fixed windows (one counter per key and window) rather than a token
+    bucket, so a key can get up to twice `rate` across a window boundary.
+    """
+
+    def __init__(self, name: str, rate: float, per: float = 60.0):
+        self.name = name
+        self.rate = rate
+        self.per = per
+
+    async def acquire(self, key: str):
+        # Raises RateLimited when the key is over its limit
+        now = time.time()
+        window = int(now // self.per)
+        try:
+            count = await shared_state.get_backend().incr(f"rl:{self.name}:{key}:{window}", self.per)
+        except Exception:
+            # An unreachable backend should not lock everyone out
+            logger.warning("Rate limit check failed for %s", self.name, exc_info=True)
+            return
+        if count > self.rate:
+            raise RateLimited(retry_after=(window + 1) * self.per - now)
+
+
+def rate_limiter(name: str, rate: float, per: float = 60.0):
+    # Per process with STATE_BACKEND=local, shared by all workers otherwise.
+    # Limiters are built at import, so only the setting is checked here; the
+    # backend client is created by the first acquire()
+    if shared_state.STATE_BACKEND == "local":
+        return RateLimiter(rate, per)
+    return SharedRateLimiter(name, rate, per)
+
+
+class ConcurrencyLimiter:
+    """Caps how many requests per key may be in progress at once."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._active: dict[str, int] = {}
+
+    @contextmanager
+    def slot(self, key: str):
+        if self._active.get(key, 0) >= self.limit:
+            raise RateLimited(retry_after=1)
+        self._active[key] = self._active.get(key, 0) + 1
+        try:
+            yield
+        finally:
+            remaining = self._active[key] - 1
+            if remaining:
+                self._active[key] = remaining
+            else:
+                del self._active[key]
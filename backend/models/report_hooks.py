@@ -0,0 +1,64 @@
+import logging
+
+from models import events, jobs, response_cache, stats, tiles
+
+logger = logging.getLogger(__name__)
+
+# Side effects of report writes. Routes call these after the write has
+# succeeded; a failing hook is logged and never fails the request.
+
+
+def _cache_tags(reports: list[dict]) -> list[str]:
+    if not reports:
+        return []
+    owners = {report.get("user_id") for report in reports}
+    return [response_cache.ALL_REPORTS] + [response_cache.user_reports_tag(owner) for owner in owners]
+
+
+async def _run(name: str, coro):
+    try:
+        await coro
+    except Exception:
+        logger.exception("Report hook %s failed", name)
+
+
+async def report_created(report: dict):
+    await response_cache.invalidate(_cache_tags([report]))
+    await _run("stats.record_created", stats.record_created(report))
+    await _run("tiles.record_created", tiles.record_created(report))
+    events.publish_local("report_created", report, reported_at=report.get("reported_at"))
+    # Duplicates share their cluster's work, so don't spend a suggestion on them
+    if not report.get("duplicate_of"):
+        await _run("jobs.enqueue_suggestion", jobs.enqueue_suggestion(report["_id"]))
+
+
+async def report_status_changed(report: dict, new_status: str):
+    # `report` is the document before the update
+    await response_cache.invalidate(_cache_tags([report]))
+    await _run("stats.record_status_change", stats.record_status_change(report, new_status))
+    await _run("tiles.record_status_change", tiles.record_status_change(report, new_status))
+    events.publish_local("report_status_changed", report, status=new_status, previous_status=report.get("status"))
+
+
+async def report_deleted(report: dict):
+    await response_cache.invalidate(_cache_tags([report]))
+    await _run("stats.record_deleted", stats.record_deleted(report))
+    await _run("tiles.record_deleted", tiles.record_deleted(report))
+    events.publish_local("report_deleted", report)
+
+
+async def reports_status_changed(reports: list[dict], new_status: str):
+    # Batch form for bulk updates: one counter write per scope / map cell
+    await response_cache.invalidate(_cache_tags(reports))
+    await _run("stats.record_status_changes", stats.record_status_changes(reports, new_status))
+    await _run("tiles.record_status_changes", tiles.record_status_changes(reports, new_status))
+    for report in reports:
+        events.publish_local("report_status_changed", report, status=new_status, previous_status=report.get("status"))
+
+
+async def reports_deleted(reports: list[dict]):
+    await response_cache.invalidate(_cache_tags(reports))
+    await _run("stats.record_deletions", stats.record_deletions(reports))
+    await _run("tiles.record_deletions", tiles.record_deletions(reports))
+    for report in reports:
+        events.publish_local("report_deleted", report)
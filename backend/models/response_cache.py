@@ -0,0 +1,177 @@
+import hashlib
+import itertools
+import json
+import logging
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from config.settings import settings
+from models.cache import TTLCache
+from models.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+# "memory" (per process), "redis" (shared by all workers, needs the redis
+# package and REDIS_URL) or "off"
+RESPONSE_CACHE_BACKEND = settings.response_cache_backend
+RESPONSE_CACHE_TTL = settings.response_cache_ttl
+RESPONSE_CACHE_SIZE = settings.response_cache_size
+REDIS_URL = settings.redis_url
+
+CACHE_REQUESTS = Counter(
+    "response_cache_requests_total", "Cached read endpoint lookups by outcome.", ("route", "result"),
+)
+
+# Invalidation tags. A cached response records the generation of each tag it
+# depends on; a write bumps the generations, so stale entries are never read
+# again and simply age out of the LRU.
+ALL_REPORTS = "reports"
+USERS = "users"
+
+
+def user_reports_tag(email: str) -> str:
+    return f"reports:user:{email}"
+
+
+def user_tag(email: str) -> str:
+    return f"user:{email}"
+
+
+class MemoryBackend:
+    def __init__(self):
+        # Bounded like the entries. A tag that is missing (never seen, or
+        # evicted) gets a number no earlier generation had, so an eviction
+        # can only cost misses, never match an older entry or ETag
+        self._generations = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+        self._counter = itertools.count(1)
+        self._entries = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+
+    def _generation(self, tag: str) -> int:
+        generation = self._generations.get(tag)
+        if generation is None:
+            generation = next(self._counter)
+            self._generations.set(tag, generation)
+        return generation
+
+    async def generations(self, tags: list[str]) -> list[int]:
+        return [self._generation(tag) for tag in tags]
+
+    async def bump(self, tags: list[str]):
+        for tag in tags:
+            self._generations.set(tag, next(self._counter))
+
+    async def get(self, key: str):
+        return self._entries.get(key)
+
+    async def set(self, key: str, etag: str, body: bytes):
+        self._entries.set(key, (etag, body))
+
+
+class RedisBackend:
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(url)
+
+    async def generations(self, tags: list[str]) -> list[int]:
+        values = await self._client.mget([f"rc:gen:{tag}" for tag in tags])
+        return [int(value or 0) for value in values]
+
+    async def bump(self, tags: list[str]):
+        async with self._client.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.incr(f"rc:gen:{tag}")
+            await pipe.execute()
+
+    async def get(self, key: str):
+        raw = await self._client.get(f"rc:{key}")
+        if raw is None:
+            return None
+        etag, body = raw.split(b"\n", 1)
+        return etag.decode(), body
+
+    async def set(self, key: str, etag: str, body: bytes):
+        await self._client.set(f"rc:{key}", etag.encode() + b"\n" + body, ex=RESPONSE_CACHE_TTL)
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None and RESPONSE_CACHE_BACKEND != "off":
+        _backend = RedisBackend(REDIS_URL) if RESPONSE_CACHE_BACKEND == "redis" else MemoryBackend()
+    return _backend
+
+
+async def invalidate(tags: list[str]):
+    # Never fails the write that triggered it; entries still expire after the TTL
+    backend = get_backend()
+    if backend is None or not tags:
+        return
+    try:
+        await backend.bump(tags)
+    except Exception:
+        logger.warning("Response cache invalidation failed for %s", tags, exc_info=True)
+
+
+def _cache_key(route: str, scope: str, request: Request, tags: list[str], generations: list[int]) -> str:
+    # Query params sorted and blank ones dropped, so equivalent URLs share an entry
+    params = sorted((k, v.strip()) for k, v in request.query_params.multi_items() if v.strip())
+    raw = json.dumps([route, scope, params, list(zip(tags, generations))])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {value.strip().removeprefix("W/") for value in header.split(",")}
+    return etag in candidates or "*" in candidates
+
+
+def _response(request: Request, etag: str, body: bytes) -> Response:
+    # no-cache: browsers may keep the body but must revalidate with If-None-Match
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+async def cached_response(request: Request, route: str, scope: str, tags: list[str], compute) -> Response:
+    """Serve a read endpoint's JSON from the cache, computing it on a miss.
+
+    `scope` is whatever the response depends on besides the query string
+    (an email, a role, ...); `tags` are the invalidation tags it depends on.
+    `compute` is an async callable returning the response data; exceptions
+    it raises (HTTPException included) propagate and nothing is cached.
+    An unreachable cache backend is skipped rather than failing the request.
+    """
+    backend = get_backend()
+    key = None
+    if backend is not None:
+        try:
+            key = _cache_key(route, scope, request, tags, await backend.generations(tags))
+            entry = await backend.get(key)
+        except Exception:
+            logger.warning("Response cache unavailable", exc_info=True)
+            backend = None
+        else:
+            if entry is not None:
+                CACHE_REQUESTS.inc(route=route, result="hit")
+                return _response(request, *entry)
+
+    CACHE_REQUESTS.inc(route=route, result="miss" if backend is not None else "bypass")
+    body = json.dumps(jsonable_encoder(await compute())).encode()
+    etag = _etag(body)
+    if backend is not None:
+        try:
+            await backend.set(key, etag, body)
+        except Exception:
+            logger.warning("Response cache unavailable", exc_info=True)
+    return _response(request, etag, body)
@@ -0,0 +1,99 @@
+import re
+from datetime import datetime, timedelta
+
+from pymongo import UpdateOne
+
+from models.categories import category_to_department
+
+
+def normalize_text(value: str) -> str:
+    return value.strip().lower()
+
+
+# Case-insensitive lookup of the known categories
+_categories = {normalize_text(category): category for category in category_to_department}
+
+
+def canonical_category(value: str) -> str | None:
+    return _categories.get(normalize_text(value))
+
+
+def location_key(location: str) -> str:
+    # Stored as location_lc so prefix searches can use an index
+    return normalize_text(location)
+
+
+def build_report_filter(
+    search: str | None = None,
+    status: str | None = None,
+    tag: str | None = None,
+    location: str | None = None,
+    date: str | None = None,
+) -> dict:
+    """Build the reported_issues filter for the /all-reports query params.
+
+    User input is never interpreted as a regex: tags match exactly (through
+    the category vocabulary), locations match by anchored prefix on the
+    normalized location_lc field and free text goes to the text index.
+    Raises ValueError for malformed input.
+    """
+    filter_query = {}
+
+    # Free-text search: a category name is an exact tag match, anything else
+    # goes to the text index (tags/location/description)
+    if search and search.strip():
+        category = canonical_category(search)
+        if category:
+            filter_query["tags"] = category
+        else:
+            filter_query["$text"] = {"$search": search.strip()}
+
+    # Status filter
+    if status and status.lower() != "all":
+        filter_query["status"] = status
+
+    # Tag filter
+    if tag and tag.lower() != "all":
+        filter_query["tags"] = canonical_category(tag) or tag
+
+    # Location prefix filter
+    if location and location.strip():
+        filter_query["location_lc"] = {"$regex": "^" + re.escape(location_key(location))}
+
+    # Single date filter (fetch reports where reported_at is on this date)
+    if date:
+        date_obj = datetime.fromisoformat(date)
+        next_day = date_obj + timedelta(days=1)
+        filter_query["reported_at"] = {
+            "$gte": date_obj,
+            "$lt": next_day
+        }
+
+    return filter_query
+
+
+async def fetch_ranked_page(collection, filter_query: dict, projection: dict, limit: int, skip: int = 0):
+    # Relevance order for $text queries; text scores cannot be used in a
+    # range filter, so these pages use skip and should stay shallow
+    projection = {**projection, "score": {"$meta": "textScore"}}
+    find = collection.find(filter_query, projection).sort([("score", {"$meta": "textScore"}), ("_id", -1)])
+    return await find.skip(skip).limit(limit).to_list()
+
+
+async def backfill_location_keys(collection, batch_size: int = 1000) -> int:
+    # Older reports were stored before location_lc existed. Done in Python
+    # rather than with $toLower, which only folds ASCII characters.
+    updated = 0
+    batch = []
+    cursor = collection.find(
+        {"location_lc": {"$exists": False}, "location": {"$type": "string"}},
+        {"location": 1},
+    ).batch_size(batch_size)
+    async for doc in cursor:
+        batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"location_lc": location_key(doc["location"])}}))
+        if len(batch) >= batch_size:
+            updated += (await collection.bulk_write(batch, ordered=False)).modified_count
+            batch = []
+    if batch:
+        updated += (await collection.bulk_write(batch, ordered=False)).modified_count
+    return updated
@@ -0,0 +1,148 @@
+import logging
+import os
+import socket
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from config.settings import settings
+from models.db import get_db
+
+logger = logging.getLogger(__name__)
+
+# Where state that every worker must agree on lives: "local" keeps rate-limit
+# counters and the user cache in each process (fine for one worker),
+# "redis" or "mongo" share them between all workers on all nodes (with
+# "mongo" users are read directly rather than cached)
+STATE_BACKEND = settings.state_backend
+REDIS_URL = settings.redis_url
+# A worker that died mid-migration holds the lock at most this long
+MIGRATION_LOCK_SECONDS = settings.migration_lock_seconds
+
+# Identifies this process as a lock holder
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def shared_state_collection():
+    return get_db()["shared_state"]
+
+
+class RedisState:
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(url)
+
+    async def incr(self, key: str, ttl: float) -> int:
+        # The expiry is only set when the counter is created
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.set(f"sv:{key}", 0, ex=max(1, int(ttl)), nx=True)
+            pipe.incr(f"sv:{key}")
+            _, count = await pipe.execute()
+        return count
+
+    async def get(self, key: str):
+        from bson import json_util
+
+        raw = await self._client.get(f"sv:{key}")
+        return None if raw is None else json_util.loads(raw)
+
+    async def set(self, key: str, value, ttl: float):
+        from bson import json_util
+
+        await self._client.set(f"sv:{key}", json_util.dumps(value), ex=max(1, int(ttl)))
+
+    async def delete(self, key: str):
+        await self._client.delete(f"sv:{key}")
+
+
+class MongoState:
+    # Expired documents linger until Mongo's TTL monitor runs (about once a
+    # minute), so reads check expires_at themselves
+
+    async def incr(self, key: str, ttl: float) -> int:
+        now = datetime.utcnow()
+        doc = await shared_state_collection().find_one_and_update(
+            {"_id": key},
+            {"$inc": {"value": 1}, "$setOnInsert": {"expires_at": now + timedelta(seconds=ttl)}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return doc["value"]
+
+    async def get(self, key: str):
+        doc = await shared_state_collection().find_one({"_id": key, "expires_at": {"$gt": datetime.utcnow()}})
+        return None if doc is None else doc["value"]
+
+    async def set(self, key: str, value, ttl: float):
+        await shared_state_collection().update_one(
+            {"_id": key},
+            {"$set": {"value": value, "expires_at": datetime.utcnow() + timedelta(seconds=ttl)}},
+            upsert=True,
+        )
+
+    async def delete(self, key: str):
+        await shared_state_collection().delete_one({"_id": key})
+
+
+_backend = None
+
+
+def get_backend():
+    # None in "local" mode; callers then keep their per-process state
+    global _backend
+    if _backend is None and STATE_BACKEND != "local":
+        if STATE_BACKEND == "redis":
+            _backend = RedisState(REDIS_URL)
+        elif STATE_BACKEND == "mongo":
+            _backend = MongoState()
+        else:
+            raise ValueError(f"Unknown STATE_BACKEND: {STATE_BACKEND}")
+    return _backend
+
+
+@asynccontextmanager
+async def exclusive(name: str, ttl: float):
+    """Yield True in the one process that holds lock `name`, False elsewhere.
+
+    The lock is a document in Mongo whatever STATE_BACKEND is, since every
+    worker already shares the database. Callers that get False don't wait.
+    """
+    key = f"lock:{name}"
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=ttl)
+    try:
+        await shared_state_collection().insert_one({"_id": key, "owner": WORKER_ID, "expires_at": expires_at})
+        acquired = True
+    except DuplicateKeyError:
+        # Take over a lock whose holder died without releasing it
+        acquired = await shared_state_collection().find_one_and_update(
+            {"_id": key, "expires_at": {"$lt": now}},
+            {"$set": {"owner": WORKER_ID, "expires_at": expires_at}},
+        ) is not None
+
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            await shared_state_collection().delete_one({"_id": key, "owner": WORKER_ID})
+
+
+def warn_process_local_settings():
+    # With shared state the rest of the deployment should not be per process either
+    if STATE_BACKEND == "local":
+        return
+    if settings.response_cache_backend == "memory":
+        logger.warning("RESPONSE_CACHE_BACKEND=memory: other workers serve stale responses until RESPONSE_CACHE_TTL")
+    if settings.suggestion_queue == "memory":
+        logger.warning("SUGGESTION_QUEUE=memory: queued suggestions are lost when their worker stops")
+    if settings.tile_cache_ttl > 0:
+        logger.warning(
+            "Map tiles are cached per worker: other workers serve stale tiles for up to TILE_CACHE_TTL=%ss",
+            settings.tile_cache_ttl,
+        )
+    if settings.events_source == "local":
+        logger.warning("EVENTS_SOURCE=local: SSE clients only see changes made through their own worker")
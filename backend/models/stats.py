@@ -0,0 +1,145 @@
+from datetime import datetime, timedelta
+
+from pymongo import ReplaceOne, UpdateOne
+
+from models.categories import category_to_department
+from models.db import get_db, issues_collection
+
+# One counter document per department plus one for everything
+ALL_SCOPE = "__all__"
+
+
+def stats_collection():
+    return get_db()["report_stats"]
+
+
+def field_key(value) -> str:
+    # Counter keys become field names, which can't contain "." or start with "$"
+    return str(value or "unknown").replace(".", "\uff0e").replace("$", "\uff04")
+
+
+def from_field_key(value: str) -> str:
+    return value.replace("\uff0e", ".").replace("\uff04", "$")
+
+
+def _day(reported_at: datetime) -> str:
+    return reported_at.strftime("%Y-%m-%d")
+
+
+def _scopes(tag: str) -> list[str]:
+    department = category_to_department.get(tag)
+    return [ALL_SCOPE, department] if department else [ALL_SCOPE]
+
+
+async def _increment(tag: str, inc: dict):
+    await _increment_many([(tag, inc)])
+
+
+async def _increment_many(changes: list[tuple[str, dict]]):
+    # Merge per scope so a batch of reports costs one write per scope
+    merged: dict[str, dict] = {}
+    for tag, inc in changes:
+        for scope in _scopes(tag):
+            scope_inc = merged.setdefault(scope, {})
+            for field, delta in inc.items():
+                scope_inc[field] = scope_inc.get(field, 0) + delta
+    operations = [
+        UpdateOne({"_id": scope}, {"$inc": inc}, upsert=True) for scope, inc in merged.items() if inc
+    ]
+    if operations:
+        await stats_collection().bulk_write(operations, ordered=False)
+
+
+async def record_created(report: dict):
+    await _increment(report.get("tags"), {
+        "total": 1,
+        f"by_status.{field_key(report.get('status'))}": 1,
+        f"by_tag.{field_key(report.get('tags'))}": 1,
+        f"by_day.{_day(report['reported_at'])}": 1,
+    })
+
+
+def _status_change(report: dict, new_status: str) -> dict:
+    return {
+        f"by_status.{field_key(report.get('status'))}": -1,
+        f"by_status.{field_key(new_status)}": 1,
+    }
+
+
+def _deletion(report: dict) -> dict:
+    return {
+        "total": -1,
+        f"by_status.{field_key(report.get('status'))}": -1,
+        f"by_tag.{field_key(report.get('tags'))}": -1,
+        f"by_day.{_day(report['reported_at'])}": -1,
+    }
+
+
+async def record_status_change(report: dict, new_status: str):
+    # `report` is the document as it was before the update
+    await record_status_changes([report], new_status)
+
+
+async def record_status_changes(reports: list[dict], new_status: str):
+    await _increment_many([
+        (report.get("tags"), _status_change(report, new_status))
+        for report in reports if report.get("status") != new_status
+    ])
+
+
+async def record_deleted(report: dict):
+    await record_deletions([report])
+
+
+async def record_deletions(reports: list[dict]):
+    await _increment_many([(report.get("tags"), _deletion(report)) for report in reports])
+
+
+async def rebuild() -> int:
+    """Recompute every counter document from reported_issues.
+
+    Used to seed the counters for existing data; returns the number of
+    counter documents written.
+    """
+    pipeline = [{"$group": {
+        "_id": {
+            "tag": "$tags",
+            "status": "$status",
+            "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$reported_at"}},
+        },
+        "count": {"$sum": 1},
+    }}]
+
+    counters: dict[str, dict] = {}
+    cursor = await issues_collection().aggregate(pipeline)
+    async for row in cursor:
+        key, count = row["_id"], row["count"]
+        for scope in _scopes(key.get("tag")):
+            doc = counters.setdefault(scope, {"_id": scope, "total": 0, "by_status": {}, "by_tag": {}, "by_day": {}})
+            doc["total"] += count
+            for group, value in (("by_status", key.get("status")), ("by_tag", key.get("tag")), ("by_day", key.get("day"))):
+                field = field_key(value)
+                doc[group][field] = doc[group].get(field, 0) + count
+
+    if counters:
+        await stats_collection().bulk_write([ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in counters.values()])
+    await stats_collection().delete_many({"_id": {"$nin": list(counters)}})
+    return len(counters)
+
+
+async def ensure_seeded():
+    # Counters only track changes, so seed them once for pre-existing reports
+    if await stats_collection().estimated_document_count() == 0:
+        if await issues_collection().estimated_document_count() > 0:
+            await rebuild()
+
+
+async def get_stats(scope: str, days: int = 30) -> dict:
+    doc = await stats_collection().find_one({"_id": scope}) or {}
+    since = _day(datetime.utcnow() - timedelta(days=days - 1))
+    return {
+        "total": doc.get("total", 0),
+        "by_status": {from_field_key(k): v for k, v in doc.get("by_status", {}).items() if v},
+        "by_tag": {from_field_key(k): v for k, v in doc.get("by_tag", {}).items() if v},
+        "by_day": {k: v for k, v in sorted(doc.get("by_day", {}).items()) if k >= since and v},
+    }
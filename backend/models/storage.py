@@ -0,0 +1,166 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from io import BytesIO
+from pathlib import Path
+
+from config.settings import settings
+from models.metrics import span
+
+logger = logging.getLogger(__name__)
+
+# "cloudinary" (default) or "local"
+IMAGE_STORAGE = settings.image_storage
+IMAGE_STORAGE_DIR = settings.image_storage_dir
+# Public base URL of this backend, used to build links to locally stored images
+PUBLIC_BASE_URL = settings.public_base_url
+
+
+def content_key(data: bytes) -> str:
+    # Images are addressed by the SHA-256 of their (compressed) bytes
+    return hashlib.sha256(data).hexdigest()
+
+
+class ImageStorage(ABC):
+    """Stores image bytes and returns a public URL for them.
+
+    Identical bytes map to the same key, so re-uploading a photo that is
+    already stored is skipped.
+    """
+
+    def put(self, data: bytes) -> dict:
+        key = content_key(data)
+        url = self.lookup(key)
+        if url is None:
+            url = self.store(key, data)
+        return {"key": key, "url": url}
+
+    @abstractmethod
+    def lookup(self, key: str) -> str | None:
+        """Return the URL of an already stored `key`, or None."""
+
+    @abstractmethod
+    def store(self, key: str, data: bytes) -> str:
+        """Store `data` under `key` and return its URL."""
+
+
+class CloudinaryStorage(ImageStorage):
+    def __init__(self, folder: str = "streetvoice", max_known: int = 10000):
+        from config.cloudinary_config import configure_cloudinary
+
+        configure_cloudinary()
+        self.folder = folder
+        self.max_known = max_known
+        # Recently stored keys -> secure URL (bounded, per process)
+        self._known: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, key: str) -> str | None:
+        with self._lock:
+            url = self._known.get(key)
+            if url is not None:
+                self._known.move_to_end(key)
+                return url
+        # Not stored by this process lately; it may still have been uploaded
+        # before a restart or by another worker
+        url = self._delivered_url(key)
+        if url is not None:
+            self._remember(key, url)
+        return url
+
+    def _delivered_url(self, key: str) -> str | None:
+        # A HEAD on the public delivery URL goes to the CDN, unlike the
+        # rate-limited Admin API. If Cloudinary can't be asked, upload anyway:
+        # overwrite=False keeps the existing copy
+        import cloudinary.utils
+        import requests
+
+        url = cloudinary.utils.cloudinary_url(f"{self.folder}/{key}", secure=True)[0]
+        try:
+            with span("cloudinary.lookup"):
+                response = requests.head(url, timeout=5)
+        except requests.RequestException:
+            logger.warning("Cloudinary lookup failed for %s", key, exc_info=True)
+            return None
+        return url if response.status_code == 200 else None
+
+    def _remember(self, key: str, url: str):
+        with self._lock:
+            self._known[key] = url
+            self._known.move_to_end(key)
+            if len(self._known) > self.max_known:
+                self._known.popitem(last=False)
+
+    def store(self, key: str, data: bytes) -> str:
+        import cloudinary.uploader
+
+        # Images are already resized and encoded locally, so no incoming
+        # transformation is requested. The content key is the public_id, so
+        # Cloudinary keeps a single copy even when another worker uploads it.
+        with span("cloudinary.upload"):
+            result = cloudinary.uploader.upload(
+                BytesIO(data),
+                public_id=key,
+                folder=self.folder,
+                overwrite=False,
+                unique_filename=False,
+            )
+        url = result["secure_url"]
+        self._remember(key, url)
+        return url
+
+
+class LocalDiskStorage(ImageStorage):
+    def __init__(self, root: str, base_url: str):
+        self.root = Path(root)
+        self.base_url = base_url.rstrip("/")
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, key: str) -> Path:
+        # Shard into sub-directories to keep directory listings small
+        return self.root / key[:2] / key[2:4] / key
+
+    def url_for(self, key: str) -> str:
+        return f"{self.base_url}/images/{key}"
+
+    def lookup(self, key: str) -> str | None:
+        if self.path_for(key).is_file():
+            return self.url_for(key)
+        return None
+
+    def store(self, key: str, data: bytes) -> str:
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file and rename so readers never see partial images
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return self.url_for(key)
+
+
+_storage: ImageStorage | None = None
+_storage_lock = threading.Lock()
+
+
+def get_storage() -> ImageStorage:
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                if IMAGE_STORAGE == "local":
+                    _storage = LocalDiskStorage(IMAGE_STORAGE_DIR, PUBLIC_BASE_URL)
+                elif IMAGE_STORAGE == "cloudinary":
+                    _storage = CloudinaryStorage()
+                else:
+                    raise ValueError(f"Unknown IMAGE_STORAGE backend: {IMAGE_STORAGE}")
+    return _storage
@@ -1,14 +1,80 @@
-import os
-import requests
-from dotenv import load_dotenv
+import asyncio
+import hashlib
+import json
+import random
+import re
+from datetime import datetime
 
-load_dotenv()
+from bson import ObjectId
 
-API_KEY = os.getenv("GOOGLE_GEMINI_API_KEY")
+from config.settings import settings
+from models.cache import TTLCache
+from models.db import issues_collection
+from models.metrics import span
+from models.response_cache import ALL_REPORTS, invalidate
+
+API_KEY = settings.google_gemini_api_key
 MODEL_NAME = "gemini-1.5-flash-001"
+# Overridable so tests and benchmarks can point at a local stub server
+GEMINI_BASE_URL = settings.gemini_base_url
+GEMINI_TIMEOUT = settings.gemini_timeout
+GEMINI_MAX_RETRIES = settings.gemini_max_retries
+GEMINI_MAX_CONNECTIONS = settings.gemini_max_connections
+
+# Suggestions for the same (normalized) report are reused
+SUGGESTION_CACHE_TTL = settings.suggestion_cache_ttl
+_cache = TTLCache(maxsize=settings.suggestion_cache_size, ttl=SUGGESTION_CACHE_TTL)
+
+# Cache key -> future of the request currently fetching it
+_in_flight: dict[str, asyncio.Future] = {}
+
+# httpx.AsyncClient, created (and httpx imported) on the first Gemini call
+_client = None
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class SuggestionError(Exception):
+    pass
+
+
+class _LeaderCancelled(SuggestionError):
+    # The request fetching a suggestion was cancelled before it finished
+    pass
+
+
+def get_client():
+    # One keep-alive connection pool for all Gemini calls
+    global _client
+    if _client is None:
+        import httpx
 
-def get_suggestion(tag: str, location: str, description: str) -> str:
-    prompt = (
+        _client = httpx.AsyncClient(
+            base_url=GEMINI_BASE_URL,
+            timeout=httpx.Timeout(GEMINI_TIMEOUT, connect=5.0),
+            limits=httpx.Limits(max_connections=GEMINI_MAX_CONNECTIONS, max_keepalive_connections=GEMINI_MAX_CONNECTIONS),
+            headers={"Content-Type": "application/json"},
+        )
+    return _client
+
+
+def _transport_error():
+    # Only evaluated once a call has raised, by which point get_client() has
+    # imported httpx
+    import httpx
+
+    return httpx.TransportError
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def build_prompt(tag: str, location: str, description: str) -> str:
+    return (
         "You are an expert city maintenance assistant helping municipal admins solve public infrastructure issues efficiently.\n\n"
         "Based on the following citizen report, provide a practical step-by-step solution plan to resolve the issue. Include:\n"
         "1. Recommended actions.\n"
@@ -22,22 +88,152 @@ def get_suggestion(tag: str, location: str, description: str) -> str:
         "Please give a  short , concise and actionable suggestion in 200 words"
     )
 
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/{MODEL_NAME}:generateContent?key={API_KEY}"
-    headers = {"Content-Type": "application/json"}
-    data = {
+
+def cache_key(tag: str, location: str, description: str) -> str:
+    # Case and whitespace differences shouldn't cost another LLM call
+    parts = [re.sub(r"\s+", " ", value or "").strip().casefold() for value in (tag, location, description)]
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+def request_body(prompt: str) -> dict:
+    return {
         "contents": [{"parts": [{"text": prompt}]}],
         "generationConfig": {
             "temperature": 0.7,
         }
     }
 
-    response = requests.post(url, json=data, headers=headers)
 
-    if response.status_code == 200:
-        candidates = response.json().get("candidates", [])
-        if candidates:
-            return candidates[0].get("content", {}).get("parts", [{"text": ""}])[0].get("text", "")
+def _backoff(attempt: int, response=None) -> float:
+    # response is the httpx.Response of a retryable failure, if there was one
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), 30.0)
+    # Exponential backoff with jitter: ~0.5s, 1s, 2s, ...
+    return 0.5 * (2 ** attempt) * (0.5 + random.random())
+
+
+async def _generate(prompt: str) -> str:
+    url = f"/v1beta/models/{MODEL_NAME}:generateContent"
+    for attempt in range(GEMINI_MAX_RETRIES + 1):
+        response = None
+        try:
+            with span("gemini.generate"):
+                response = await get_client().post(url, params={"key": API_KEY}, json=request_body(prompt))
+        except _transport_error() as e:
+            if attempt == GEMINI_MAX_RETRIES:
+                raise SuggestionError(f"Gemini request failed: {e}") from e
+        else:
+            if response.status_code == 200:
+                break
+            if response.status_code not in RETRY_STATUSES or attempt == GEMINI_MAX_RETRIES:
+                raise SuggestionError(f"Error {response.status_code}: {response.text}")
+        await asyncio.sleep(_backoff(attempt, response))
+
+    candidates = response.json().get("candidates", [])
+    if candidates:
+        return candidates[0].get("content", {}).get("parts", [{"text": ""}])[0].get("text", "")
+    return ""
+
+
+def cached_suggestion(tag: str, location: str, description: str) -> str | None:
+    return _cache.get(cache_key(tag, location, description))
+
+
+async def stored_suggestion(report_id: ObjectId) -> str | None:
+    # Suggestion already saved on the report (precomputed or generated earlier)
+    report = await issues_collection().find_one({"_id": report_id}, {"suggestion": 1})
+    return report.get("suggestion") if report else None
+
+
+async def get_suggestion(tag: str, location: str, description: str) -> str:
+    key = cache_key(tag, location, description)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    # Someone is already asking for this exact report: wait for their answer
+    pending = _in_flight.get(key)
+    if pending is not None:
+        try:
+            return await asyncio.shield(pending)
+        except _LeaderCancelled:
+            # Its client went away; the first waiter back becomes the new leader
+            return await get_suggestion(tag, location, description)
+
+    future = asyncio.get_running_loop().create_future()
+    _in_flight[key] = future
+    try:
+        text = await _generate(build_prompt(tag, location, description))
+        if text:
+            _cache.set(key, text)
         else:
-            return "No suggestion returned by the model."
-    else:
-        return f"Error {response.status_code}: {response.text}"
+            text = "No suggestion returned by the model."
+        future.set_result(text)
+        return text
+    except asyncio.CancelledError:
+        # Cancelling the future would cancel every waiter with it
+        future.set_exception(_LeaderCancelled("Suggestion request was cancelled"))
+        future.exception()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        # Mark it retrieved so asyncio doesn't warn when nobody was waiting
+        future.exception()
+        raise
+    finally:
+        _in_flight.pop(key, None)
+
+
+def _chunk_text(chunk: dict) -> str:
+    candidates = chunk.get("candidates", [])
+    if not candidates:
+        return ""
+    parts = candidates[0].get("content", {}).get("parts", [])
+    return "".join(part.get("text", "") for part in parts)
+
+
+async def stream_suggestion(tag: str, location: str, description: str):
+    """Yield the suggestion text in pieces as Gemini generates it.
+
+    A cached suggestion is yielded in one piece. The complete text is cached
+    once the stream finishes; a stream that fails midway is not retried.
+    """
+    key = cache_key(tag, location, description)
+    cached = _cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+
+    url = f"/v1beta/models/{MODEL_NAME}:streamGenerateContent"
+    body = request_body(build_prompt(tag, location, description))
+    pieces = []
+    try:
+        with span("gemini.stream"):
+            async with get_client().stream("POST", url, params={"key": API_KEY, "alt": "sse"}, json=body) as response:
+                if response.status_code != 200:
+                    error = (await response.aread()).decode(errors="replace")
+                    raise SuggestionError(f"Error {response.status_code}: {error}")
+                # Server-sent events: one JSON GenerateContentResponse per data line
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    text = _chunk_text(json.loads(line[len("data:"):]))
+                    if text:
+                        pieces.append(text)
+                        yield text
+    except _transport_error() as e:
+        raise SuggestionError(f"Gemini request failed: {e}") from e
+
+    if pieces:
+        _cache.set(key, "".join(pieces))
+
+
+async def save_suggestion(report_id: ObjectId, text: str):
+    # Keep the latest suggestion on the report so it doesn't need regenerating
+    await issues_collection().update_one(
+        {"_id": report_id},
+        {"$set": {"suggestion": text, "suggestion_at": datetime.utcnow()}}
+    )
+    # /all-reports includes the suggestion
+    await invalidate([ALL_REPORTS])
@@ -0,0 +1,223 @@
+import math
+
+from pymongo import UpdateOne
+
+from config.settings import settings
+from models.cache import TTLCache
+from models.db import get_db, issues_collection
+from models.stats import field_key, from_field_key
+
+# Counts are kept per geohash cell at each of these precisions
+# (3 ~ 156 km, 5 ~ 4.9 km, 7 ~ 153 m cells)
+GEOHASH_PRECISIONS = range(3, 8)
+MAX_ZOOM = 20
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# (z, x, y) -> cell documents for that tile. Invalidated only in the process
+# that made the change, so other workers may serve a tile this much older
+TILE_CACHE_TTL = settings.tile_cache_ttl
+_tile_cache = TTLCache(maxsize=4096, ttl=TILE_CACHE_TTL)
+
+
+def cells_collection():
+    return get_db()["geo_cells"]
+
+
+def geohash_encode(latitude: float, longitude: float, precision: int) -> str:
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        # Bits alternate between longitude and latitude, longitude first
+        rng, coord = (lng_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        if coord >= mid:
+            value = (value << 1) | 1
+            rng[0] = mid
+        else:
+            value <<= 1
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def geohash_center(geohash: str) -> tuple[float, float]:
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _BASE32.index(char)
+        for shift in range(4, -1, -1):
+            rng = lng_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (value >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return (lat_range[0] + lat_range[1]) / 2, (lng_range[0] + lng_range[1]) / 2
+
+
+def precision_for_zoom(zoom: int) -> int:
+    # Roughly 16-64 cells across a 256px tile
+    if zoom <= 6:
+        return 3
+    if zoom <= 8:
+        return 4
+    if zoom <= 11:
+        return 5
+    if zoom <= 13:
+        return 6
+    return 7
+
+
+def tile_bounds(z: int, x: int, y: int) -> tuple[float, float, float, float]:
+    # Web Mercator (slippy map) tile -> (west, south, east, north)
+    n = 2 ** z
+
+    def lat(tile_y):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * tile_y / n))))
+
+    return x / n * 360 - 180, lat(y + 1), (x + 1) / n * 360 - 180, lat(y)
+
+
+def tile_for(latitude: float, longitude: float, z: int) -> tuple[int, int]:
+    n = 2 ** z
+    latitude = max(min(latitude, 85.0511), -85.0511)
+    x = int((longitude + 180) / 360 * n)
+    y = int((1 - math.asinh(math.tan(math.radians(latitude))) / math.pi) / 2 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def _affected_tiles(centers: dict) -> set[tuple]:
+    # The tiles holding a changed cell; a tile lists the cells whose centre
+    # falls inside it, which may not be the report's own tile
+    return {(z, *tile_for(*centers[precision_for_zoom(z)], z)) for z in range(MAX_ZOOM + 1)}
+
+
+async def _apply(report: dict, inc: dict):
+    await _apply_many([(report, inc)])
+
+
+async def _apply_many(changes: list[tuple[dict, dict]]):
+    # changes: [(report, {(tag, status): delta})]; merged into one write per cell
+    updates: dict[str, dict] = {}
+    stale: set[tuple] = set()
+    for report, inc in changes:
+        geo = report.get("geo")
+        if not geo:
+            continue
+        longitude, latitude = geo["coordinates"]
+        report_centers = {}
+        for precision in GEOHASH_PRECISIONS:
+            geohash = geohash_encode(latitude, longitude, precision)
+            center_lat, center_lng = geohash_center(geohash)
+            report_centers[precision] = (center_lat, center_lng)
+            update = updates.setdefault(f"{precision}:{geohash}", {
+                "$inc": {"total": 0},
+                "$setOnInsert": {"p": precision, "gh": geohash, "loc": [center_lng, center_lat]},
+            })
+            for (tag, status), delta in inc.items():
+                field = f"counts.{field_key(tag)}.{field_key(status)}"
+                update["$inc"][field] = update["$inc"].get(field, 0) + delta
+                update["$inc"]["total"] += delta
+        stale |= _affected_tiles(report_centers)
+    if not updates:
+        return
+    await cells_collection().bulk_write(
+        [UpdateOne({"_id": cell_id}, update, upsert=True) for cell_id, update in updates.items()],
+        ordered=False,
+    )
+    # Only those tiles are dropped from the cache
+    for tile in stale:
+        _tile_cache.pop(tile)
+
+
+def _key(report: dict, status=None) -> tuple:
+    return report.get("tags"), status if status is not None else report.get("status")
+
+
+async def record_created(report: dict):
+    await _apply(report, {_key(report): 1})
+
+
+async def record_status_change(report: dict, new_status: str):
+    # `report` is the document as it was before the update
+    await record_status_changes([report], new_status)
+
+
+async def record_status_changes(reports: list[dict], new_status: str):
+    await _apply_many([
+        (report, {_key(report): -1, _key(report, new_status): 1})
+        for report in reports if report.get("status") != new_status
+    ])
+
+
+async def record_deleted(report: dict):
+    await record_deletions([report])
+
+
+async def record_deletions(reports: list[dict]):
+    await _apply_many([(report, {_key(report): -1}) for report in reports])
+
+
+async def rebuild(batch_size: int = 1000) -> int:
+    """Recompute all geo_cells from reported_issues; returns cells written."""
+    cells: dict[str, dict] = {}
+    cursor = issues_collection().find({"geo": {"$exists": True}}, {"geo": 1, "tags": 1, "status": 1}).batch_size(batch_size)
+    async for report in cursor:
+        longitude, latitude = report["geo"]["coordinates"]
+        tag, status = field_key(report.get("tags")), field_key(report.get("status"))
+        for precision in GEOHASH_PRECISIONS:
+            geohash = geohash_encode(latitude, longitude, precision)
+            cell = cells.get(f"{precision}:{geohash}")
+            if cell is None:
+                center_lat, center_lng = geohash_center(geohash)
+                cell = cells[f"{precision}:{geohash}"] = {
+                    "_id": f"{precision}:{geohash}", "p": precision, "gh": geohash,
+                    "loc": [center_lng, center_lat], "total": 0, "counts": {},
+                }
+            cell["total"] += 1
+            by_status = cell["counts"].setdefault(tag, {})
+            by_status[status] = by_status.get(status, 0) + 1
+
+    await cells_collection().delete_many({})
+    documents = list(cells.values())
+    for start in range(0, len(documents), batch_size):
+        await cells_collection().insert_many(documents[start:start + batch_size], ordered=False)
+    _tile_cache.clear()
+    return len(documents)
+
+
+async def ensure_seeded():
+    if await cells_collection().estimated_document_count() == 0:
+        if await issues_collection().find_one({"geo": {"$exists": True}}, {"_id": 1}):
+            await rebuild()
+
+
+async def tile_cells(z: int, x: int, y: int) -> list[dict]:
+    key = (z, x, y)
+    cells = _tile_cache.get(key)
+    if cells is None:
+        west, south, east, north = tile_bounds(z, x, y)
+        cells = await cells_collection().find(
+            {"loc": {"$geoWithin": {"$box": [[west, south], [east, north]]}}, "p": precision_for_zoom(z)},
+            {"gh": 1, "loc": 1, "counts": 1},
+        ).to_list()
+        _tile_cache.set(key, cells)
+    return cells
+
+
+def cell_count(cell: dict, tags: set[str] | None = None, status: str | None = None) -> int:
+    # Sum a cell's counters, optionally restricted to some categories / one status
+    total = 0
+    for tag_key, by_status in cell.get("counts", {}).items():
+        if tags is not None and from_field_key(tag_key) not in tags:
+            continue
+        for status_key, count in by_status.items():
+            if status is None or from_field_key(status_key) == status:
+                total += count
+    return total
@@ -0,0 +1,107 @@
+import asyncio
+import hashlib
+import re
+import time
+
+from jose import JWTError, jwt
+
+from config.settings import settings
+from models.cache import TTLCache
+
+SECRET_KEY = settings.jwt_secret
+ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_MINUTES = 30
+GOOGLE_CLIENT_ID = settings.google_client_id
+GOOGLE_CERTS_URL = settings.google_certs_url
+GOOGLE_ISSUERS = {"accounts.google.com", "https://accounts.google.com"}
+
+# Verified token -> email, so repeat requests with the same token skip verification
+PRINCIPAL_CACHE_TTL = settings.principal_cache_ttl
+_principal_cache = TTLCache(maxsize=settings.principal_cache_size, ttl=PRINCIPAL_CACHE_TTL)
+
+# Google signing certs, refreshed according to their Cache-Control max-age
+_session = None
+_certs: dict | None = None
+_certs_expire_at = 0.0
+_certs_lock = asyncio.Lock()
+
+
+def _fetch_google_certs() -> tuple[dict, int]:
+    global _session
+    if _session is None:
+        # Only Google sign-ins need this, so requests is imported on first use
+        import requests
+
+        _session = requests.Session()
+    response = _session.get(GOOGLE_CERTS_URL, timeout=5)
+    response.raise_for_status()
+    match = re.search(r"max-age=(\d+)", response.headers.get("Cache-Control", ""))
+    max_age = int(match.group(1)) if match else 3600
+    return response.json(), max_age
+
+
+async def google_certs(refresh: bool = False) -> dict:
+    global _certs, _certs_expire_at
+    if not refresh and _certs is not None and time.monotonic() < _certs_expire_at:
+        return _certs
+    async with _certs_lock:
+        # Another request may have refreshed them while we waited
+        if not refresh and _certs is not None and time.monotonic() < _certs_expire_at:
+            return _certs
+        certs, max_age = await asyncio.to_thread(_fetch_google_certs)
+        _certs, _certs_expire_at = certs, time.monotonic() + max_age
+        return _certs
+
+
+def _decode_google_token(token: str, certs: dict) -> dict:
+    from google.auth import jwt as google_jwt
+
+    idinfo = google_jwt.decode(token, certs=certs, audience=GOOGLE_CLIENT_ID, clock_skew_in_seconds=10)
+    if idinfo.get("iss") not in GOOGLE_ISSUERS:
+        raise ValueError("Wrong issuer")
+    return idinfo
+
+
+async def verify_google_token(token: str) -> dict:
+    # Raises ValueError (or JWTError for malformed tokens) when the token is invalid
+    certs = await google_certs()
+    if jwt.get_unverified_header(token).get("kid") not in certs:
+        # Google rotated its keys before our cached copy expired
+        certs = await google_certs(refresh=True)
+    return _decode_google_token(token, certs)
+
+
+def token_issuer(token: str) -> str | None:
+    try:
+        return jwt.get_unverified_claims(token).get("iss")
+    except JWTError:
+        return None
+
+
+async def email_from_token(token: str) -> str | None:
+    """Return the email of a valid Google ID token or app JWT, else None."""
+    key = hashlib.sha256(token.encode()).digest()
+    email = _principal_cache.get(key)
+    if email is not None:
+        return email
+
+    # Pick the verifier from the unverified issuer instead of trying both
+    if token_issuer(token) in GOOGLE_ISSUERS:
+        try:
+            claims = await verify_google_token(token)
+        except Exception:
+            return None
+        email = claims.get("email")
+    else:
+        try:
+            claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            return None
+        email = claims.get("sub")
+
+    if email:
+        # Never cache a principal past the token's own expiry
+        ttl = min(PRINCIPAL_CACHE_TTL, claims.get("exp", 0) - time.time())
+        if ttl > 0:
+            _principal_cache.set(key, email, ttl=ttl)
+    return email
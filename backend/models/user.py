@@ -1,18 +1,123 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+
 from fastapi import APIRouter
-from pymongo import MongoClient
-from passlib.context import CryptContext
-from dotenv import load_dotenv
-import os
-
-# Environment setup
-load_dotenv()
-MONGO_URI = os.getenv("MONGODB_URI")
-client = MongoClient(MONGO_URI)
-db = client["StreetVoice"]  # Replace with your actual database name
-users = db["users"]
-
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+from config.settings import settings
+from models import shared_state
+from models.cache import TTLCache
+from models.db import users_collection
+from models.metrics import span
+
+logger = logging.getLogger(__name__)
+
+
+@cache
+def pwd_context():
+    # Password hashing; passlib is only imported once a password is checked
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+# bcrypt is deliberately slow (~100-300 ms CPU), so it runs in its own small
+# pool and callers are turned away once too much work is queued.
+BCRYPT_WORKERS = settings.bcrypt_workers
+BCRYPT_MAX_PENDING = settings.bcrypt_max_pending
+_hash_pool = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix="bcrypt")
+_pending_hashes = 0
+
+
+class PasswordHashingBusy(Exception):
+    pass
+
+
+async def _run_in_hash_pool(fn, *args):
+    global _pending_hashes
+    if _pending_hashes >= BCRYPT_MAX_PENDING:
+        raise PasswordHashingBusy()
+    _pending_hashes += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_pool, fn, *args)
+    finally:
+        _pending_hashes -= 1
+
+
+async def hash_password(password: str) -> str:
+    with span("bcrypt.hash"):
+        return await _run_in_hash_pool(pwd_context().hash, password)
+
+
+async def verify_password(password: str, hashed_password: str) -> tuple[bool, str | None]:
+    # Returns (valid, new_hash); new_hash is set when the stored hash uses an
+    # outdated scheme or work factor and should be replaced
+    with span("bcrypt.verify"):
+        return await _run_in_hash_pool(pwd_context().verify_and_update, password, hashed_password)
+
+# email -> user document, for the authenticated-request hot path. With
+# STATE_BACKEND=redis the cache lives there instead, so invalidating a user
+# (a role change, say) takes effect on every worker at once. With
+# STATE_BACKEND=mongo users are read directly: a cache read there would
+# just replace one indexed Mongo read with another.
+USER_CACHE_TTL = settings.user_cache_ttl
+_user_cache = TTLCache(maxsize=settings.user_cache_size, ttl=USER_CACHE_TTL)
+
+# Never loaded here (so never cached); password checks read the users
+# collection themselves
+USER_SECRET_FIELDS = {"password": 0, "admin_code": 0}
+
+
+async def _cached_user(email: str) -> dict | None:
+    if shared_state.STATE_BACKEND == "local":
+        return _user_cache.get(email)
+    if shared_state.STATE_BACKEND != "redis":
+        return None
+    try:
+        return await shared_state.get_backend().get(f"user:{email}")
+    except Exception:
+        logger.warning("Shared user cache read failed", exc_info=True)
+        return None
+
+
+async def _cache_user(email: str, user: dict):
+    if shared_state.STATE_BACKEND == "local":
+        _user_cache.set(email, user)
+        return
+    if shared_state.STATE_BACKEND != "redis":
+        return
+    try:
+        await shared_state.get_backend().set(f"user:{email}", user, USER_CACHE_TTL)
+    except Exception:
+        logger.warning("Shared user cache write failed", exc_info=True)
+
+
+async def get_user_by_email(email: str) -> dict | None:
+    # The returned document has no password hash or admin code
+    user = await _cached_user(email)
+    if user is None:
+        user = await users_collection().find_one({"email": email}, USER_SECRET_FIELDS)
+        if user is None:
+            return None
+        # Convert ObjectId to str if needed
+        user["_id"] = str(user["_id"])
+        await _cache_user(email, user)
+    # Callers get their own copy so they can't modify the cached one
+    return dict(user)
+
+
+async def invalidate_user(email: str):
+    # Call after any write to the user's document
+    _user_cache.pop(email)
+    if shared_state.STATE_BACKEND != "redis":
+        return
+    try:
+        await shared_state.get_backend().delete(f"user:{email}")
+    except Exception:
+        # The entry still expires after USER_CACHE_TTL
+        logger.warning("Shared user cache invalidation failed", exc_info=True)
 
 router = APIRouter()
 
@@ -0,0 +1,91 @@
+from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime, timedelta
+from dependencies import get_current_admin
+from models import db, stats, tiles
+from models.indexes import INDEXES, plan_stages
+from models.pagination import REPORT_SORT
+
+router = APIRouter()
+
+
+def query_shapes() -> list[tuple]:
+    # Common query shapes issued by the routes: (name, collection, filter, sort).
+    # Built per request so the date query covers the current day
+    day = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    return [
+        ("all_reports", "reported_issues", {}, REPORT_SORT),
+        ("all_reports_by_status", "reported_issues", {"status": "submitted"}, REPORT_SORT),
+        (
+            "all_reports_by_status_and_tag",
+            "reported_issues",
+            {"status": "submitted", "tags": "Garbage / Waste"},
+            REPORT_SORT,
+        ),
+        (
+            "all_reports_by_date",
+            "reported_issues",
+            {"reported_at": {"$gte": day, "$lt": day + timedelta(days=1)}},
+            REPORT_SORT,
+        ),
+        ("all_reports_by_location_prefix", "reported_issues", {"location_lc": {"$regex": "^sector 1"}}, REPORT_SORT),
+        ("my_reports", "reported_issues", {"user_id": "someone@example.com"}, REPORT_SORT),
+        ("text_search", "reported_issues", {"$text": {"$search": "pothole"}}, None),
+        ("user_by_email", "users", {"email": "someone@example.com"}, None),
+    ]
+
+
+@router.get("/admin/query-plans")
+async def get_query_plans(current_user: dict = Depends(get_current_admin)):
+    database = db.get_db()
+    try:
+        indexes = {}
+        for collection_name in INDEXES:
+            info = await database[collection_name].index_information()
+            indexes[collection_name] = sorted(info)
+
+        queries = []
+        for name, collection_name, filter_query, sort in query_shapes():
+            cursor = database[collection_name].find(filter_query).limit(20)
+            if sort:
+                cursor = cursor.sort(sort)
+            explain = await cursor.explain()
+
+            stages = plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {}))
+            stats = explain.get("executionStats", {})
+            queries.append({
+                "name": name,
+                "collection": collection_name,
+                "stages": stages,
+                "collscan": "COLLSCAN" in stages,
+                "docs_examined": stats.get("totalDocsExamined"),
+                "keys_examined": stats.get("totalKeysExamined"),
+                "execution_ms": stats.get("executionTimeMillis"),
+            })
+
+        return {
+            "indexes": indexes,
+            "queries": queries,
+            "collscans": [q["name"] for q in queries if q["collscan"]]
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error explaining queries: {str(e)}")
+
+
+@router.post("/admin/stats/rebuild")
+async def rebuild_stats(current_user: dict = Depends(get_current_admin)):
+    # Recompute the /stats counters from reported_issues (e.g. after manual edits)
+    try:
+        scopes = await stats.rebuild()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error rebuilding stats: {str(e)}")
+    return {"message": "Stats rebuilt", "scopes": scopes}
+
+
+@router.post("/admin/tiles/rebuild")
+async def rebuild_tiles(current_user: dict = Depends(get_current_admin)):
+    # Recompute the map tile cells from reported_issues
+    try:
+        cells = await tiles.rebuild()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error rebuilding tiles: {str(e)}")
+    return {"message": "Tiles rebuilt", "cells": cells}
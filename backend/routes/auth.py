@@ -1,55 +1,66 @@
-from fastapi import APIRouter, HTTPException, Depends, status, UploadFile, Form, File
+from fastapi import APIRouter, HTTPException, Depends, status, UploadFile, Form, File, Request, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from models.user import users, pwd_context
+from models.user import (
+    PasswordHashingBusy, get_user_by_email, hash_password, invalidate_user, verify_password
+)
+from models.ratelimit import ConcurrencyLimiter, RateLimited, rate_limiter
+from contextlib import asynccontextmanager
+import json
+from models.db import users_collection
+from config.settings import settings
+from models.tokens import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, verify_google_token
+from dependencies import get_current_admin, get_current_user_email
 from datetime import datetime, timedelta
-import cloudinary.uploader
-from io import BytesIO
-from PIL import Image
-from jose import JWTError, jwt
-from google.auth.transport.requests import Request as GoogleRequest
-from google.oauth2 import id_token
-import os
-from dotenv import load_dotenv
-from fastapi.security import OAuth2PasswordBearer
-
-# Load env variables
-load_dotenv()
-
-SECRET_KEY = os.getenv("JWT_SECRET", "your_super_secret_key")
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
-GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
+from models.ingest import normalize_in_pool, store_image
+from models.pagination import fetch_id_page
+from models.response_cache import USERS, cached_response, invalidate, user_tag
+from jose import jwt
+from pymongo.errors import DuplicateKeyError
 
 router = APIRouter()
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
-# ---------------- UTILITIES ----------------
+# Limits in front of the bcrypt pool (attempts per minute)
+PASSWORD_RATE_PER_IP = settings.password_rate_per_ip
+PASSWORD_RATE_PER_EMAIL = settings.password_rate_per_email
+PASSWORD_CONCURRENCY_PER_KEY = settings.password_concurrency_per_key
 
-def compress_image(upload_file: UploadFile, quality: int = 70):
-    image = Image.open(upload_file.file)
-    image = image.convert("RGB")  # Ensure RGB
-    buffer = BytesIO()
-    image.save(buffer, format="JPEG", quality=quality)
-    buffer.seek(0)
-    return buffer
-
-def upload_image_to_cloudinary(image: UploadFile):
-    compressed_file = compress_image(image, quality=70)
-    result = cloudinary.uploader.upload(
-        compressed_file,
-        transformation=[
-            {"width": 800, "crop": "scale"},
-            {"quality": "auto"},
-            {"fetch_format": "auto"},
-        ]
-    )
-    return result["secure_url"]
+_ip_limiter = rate_limiter("password_ip", PASSWORD_RATE_PER_IP)
+_email_limiter = rate_limiter("password_email", PASSWORD_RATE_PER_EMAIL)
+# In-flight caps protect this process's bcrypt pool, so they stay per process
+_password_in_flight = ConcurrencyLimiter(PASSWORD_CONCURRENCY_PER_KEY)
 
-def get_hashed_password(password: str):
-    return pwd_context.hash(password)
+# ---------------- UTILITIES ----------------
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+async def upload_profile_picture(image: UploadFile):
+    image_bytes, _ = await normalize_in_pool(await image.read())
+    stored = await store_image(image_bytes)
+    return stored["url"]
+
+@asynccontextmanager
+async def password_guard(request: Request, email: str):
+    # Rate and concurrency limits per client IP and per email, so a
+    # credential-stuffing burst can't monopolise the bcrypt pool
+    ip = request.client.host if request.client else "unknown"
+    email = email.lower()
+    try:
+        await _ip_limiter.acquire(ip)
+        await _email_limiter.acquire(email)
+        with _password_in_flight.slot(f"ip:{ip}"), _password_in_flight.slot(f"email:{email}"):
+            yield
+    except RateLimited as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many attempts, please try again later",
+            headers={"Retry-After": str(max(1, int(e.retry_after)))}
+        )
+    except PasswordHashingBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy, please try again",
+            headers={"Retry-After": "1"}
+        )
 
 def create_access_token(data: dict, expires_delta: timedelta):
     to_encode = data.copy()
@@ -61,29 +72,6 @@ def is_profile_complete(user):
     required_fields = ["full_name", "role"]
     return all(user.get(field) for field in required_fields)
 
-# ---------------- AUTH HELPERS ----------------
-
-async def get_current_user_email(token: str = Depends(oauth2_scheme)) -> str:
-    # Try Google token verification first
-    try:
-        idinfo = id_token.verify_oauth2_token(token, GoogleRequest(), GOOGLE_CLIENT_ID)
-        email = idinfo.get("email")
-        if email:
-            return email
-    except Exception:
-        pass
-
-    # Fallback to custom JWT
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_email = payload.get("sub")
-        if user_email:
-            return user_email
-    except JWTError:
-        pass
-
-    raise HTTPException(status_code=401, detail="Invalid authentication credentials")
-
 # ---------------- SCHEMAS ----------------
 
 class UserCreate(BaseModel):
@@ -97,14 +85,15 @@ class UserLogin(BaseModel):
 # ---------------- ROUTES ----------------
 
 @router.post("/register", status_code=201)
-async def register(user: UserCreate):
+async def register(user: UserCreate, request: Request):
     if not user.email or not user.password:
         raise HTTPException(status_code=400, detail="Email and password are required")
 
-    if users.find_one({"email": user.email}):
+    if await users_collection().find_one({"email": user.email}):
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed_password = get_hashed_password(user.password)
+    async with password_guard(request, user.email):
+        hashed_password = await hash_password(user.password)
     
     new_user = {
         "email": user.email,
@@ -120,18 +109,34 @@ async def register(user: UserCreate):
         "profile_picture": None
     }
     
-    users.insert_one(new_user)
+    try:
+        await users_collection().insert_one(new_user)
+    except DuplicateKeyError:
+        # Registered by a concurrent request since the check above
+        raise HTTPException(status_code=400, detail="Email already registered")
+    await invalidate([USERS])
     return {"msg": "User registered successfully"}
 
 @router.post("/login")
-async def login(user: UserLogin):
+async def login(user: UserLogin, request: Request):
     if not user.email or not user.password:
         raise HTTPException(status_code=400, detail="Email and password are required")
 
-    db_user = users.find_one({"email": user.email})
-    
-    if not db_user or not verify_password(user.password, db_user.get("password", "")):
+    async with password_guard(request, user.email):
+        db_user = await users_collection().find_one({"email": user.email})
+
+        # Google-only accounts have no password hash
+        valid, new_hash = False, None
+        if db_user and db_user.get("password"):
+            valid, new_hash = await verify_password(user.password, db_user["password"])
+
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid email or password")
+
+    # Transparently upgrade hashes made with an older work factor
+    if new_hash:
+        await users_collection().update_one({"_id": db_user["_id"]}, {"$set": {"password": new_hash}})
+        await invalidate_user(user.email)
     
     token = create_access_token(
         data={"sub": user.email},
@@ -152,7 +157,7 @@ async def login(user: UserLogin):
 async def google_login(token: str = Form(...)):
     # Verify Google token and extract email
     try:
-        idinfo = id_token.verify_oauth2_token(token, GoogleRequest(), GOOGLE_CLIENT_ID)
+        idinfo = await verify_google_token(token)
         email = idinfo.get("email")
         if not email:
             raise HTTPException(status_code=400, detail="Google token did not contain email")
@@ -160,7 +165,7 @@ async def google_login(token: str = Form(...)):
         raise HTTPException(status_code=401, detail="Invalid Google token")
 
     # Check if user exists, else create with minimal info
-    user = users.find_one({"email": email})
+    user = await users_collection().find_one({"email": email})
     if not user:
         # Create new user with auth_provider = google
         new_user = {
@@ -176,8 +181,13 @@ async def google_login(token: str = Form(...)):
             "admin_code": None,
             "profile_picture": None
         }
-        users.insert_one(new_user)
-        user = new_user  # Newly created user
+        try:
+            await users_collection().insert_one(new_user)
+            await invalidate([USERS])
+            user = new_user  # Newly created user
+        except DuplicateKeyError:
+            # A concurrent first login created it
+            user = await users_collection().find_one({"email": email})
 
     profile_complete = is_profile_complete(user)
 
@@ -195,11 +205,16 @@ async def google_login(token: str = Form(...)):
 
 
 @router.get("/me")
-async def get_me(email: str = Depends(get_current_user_email)):
-    user = users.find_one({"email": email}, {"_id": 0, "password": 0})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    return user
+async def get_me(request: Request, email: str = Depends(get_current_user_email)):
+    async def profile():
+        user = await get_user_by_email(email)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        user.pop("_id", None)
+        user.pop("password", None)
+        return user
+
+    return await cached_response(request, "me", email, [user_tag(email)], profile)
 
 @router.put("/complete-profile")
 async def complete_profile(
@@ -219,7 +234,7 @@ async def complete_profile(
     }
 
     if profile_picture:
-        image_url = upload_image_to_cloudinary(profile_picture)
+        image_url = await upload_profile_picture(profile_picture)
         update_data["profile_picture"] = image_url
 
     # Only admins have these extra fields
@@ -232,7 +247,10 @@ async def complete_profile(
         update_data["location"] = None
         update_data["admin_code"] = None
 
-    result = users.update_one({"email": email}, {"$set": update_data})
+    result = await users_collection().update_one({"email": email}, {"$set": update_data})
+
+    await invalidate_user(email)
+    await invalidate([user_tag(email), USERS])
 
     if result.modified_count == 0:
         raise HTTPException(status_code=400, detail="Profile not updated")
@@ -244,10 +262,54 @@ async def logout():
     # For stateless JWT, logout is usually handled client-side by deleting token
     return {"msg": "User logged out successfully"}
 
+# Fields listed by /users and /users/export (never the password hash)
+USER_LIST_PROJECTION = {
+    "email": 1, "full_name": 1, "role": 1, "department": 1, "auth_provider": 1, "created_at": 1
+}
+USER_EXPORT_BATCH_SIZE = 1000
+
+
+def _listed_user(user: dict) -> dict:
+    user["_id"] = str(user["_id"])
+    return user
+
+
 @router.get("/users")
-async def get_users():
-    try:
-        all_users = list(users.find({}, {"_id": 0, "email": 1, "created_at": 1}))
-        return {"users": all_users}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+async def get_users(
+    request: Request,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str = Query(None),  # next_cursor from the previous page
+    current_user: dict = Depends(get_current_admin)
+):
+    async def users():
+        try:
+            page, next_cursor = await fetch_id_page(users_collection(), {}, USER_LIST_PROJECTION, limit, cursor)
+            return {"users": [_listed_user(user) for user in page], "next_cursor": next_cursor}
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    return await cached_response(request, "users", "admin", [USERS], users)
+
+
+@router.get("/users/export")
+async def export_users(current_user: dict = Depends(get_current_admin)):
+    # One JSON object per line, read from the cursor batch by batch so the
+    # full user list is never held in memory
+    async def lines():
+        cursor = users_collection().find({}, USER_LIST_PROJECTION).sort("_id", 1).batch_size(USER_EXPORT_BATCH_SIZE)
+        chunk = []
+        async for user in cursor:
+            chunk.append(json.dumps(jsonable_encoder(_listed_user(user))))
+            if len(chunk) >= 200:
+                yield "\n".join(chunk) + "\n"
+                chunk = []
+        if chunk:
+            yield "\n".join(chunk) + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="users.ndjson"'}
+    )
@@ -1,14 +1,55 @@
-from fastapi import APIRouter
-from pydantic import BaseModel, EmailStr
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import BaseModel, EmailStr, Field
+from dependencies import get_current_admin
+from models.contact import check_rate, contact_collection, submit
+from models.pagination import fetch_id_page
+from models.ratelimit import RateLimited
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Fields shown in the admin listing
+CONTACT_LIST_PROJECTION = {"name": 1, "email": 1, "message": 1, "ip": 1, "received_at": 1}
+
 class ContactForm(BaseModel):
-    name: str
+    name: str = Field(..., max_length=200)
     email: EmailStr
-    message: str
+    message: str = Field(..., min_length=1, max_length=5000)
 
 @router.post("/contact")
-async def receive_contact(form: ContactForm):
-    print(f"Message received from {form.name} <{form.email}>: {form.message}")
+async def receive_contact(form: ContactForm, request: Request):
+    ip = request.client.host if request.client else "unknown"
+    try:
+        await check_rate(ip, form.email)
+    except RateLimited as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many messages, please try again later",
+            headers={"Retry-After": str(max(1, int(e.retry_after)))}
+        )
+
+    # Repeats get the same answer, so there is nothing to learn by resending
+    stored = await submit(form.name, form.email, form.message, ip)
+    if stored:
+        logger.info("Contact message received", extra={"contact_email": form.email, "length": len(form.message)})
     return {"message": "Your message has been received."}
+
+@router.get("/admin/contact-messages")
+async def list_contact_messages(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str = Query(None),  # next_cursor from the previous page
+    email: str = Query(None),
+    current_user: dict = Depends(get_current_admin)
+):
+    filter_query = {"email_lc": email.lower()} if email else {}
+    try:
+        page, next_cursor = await fetch_id_page(
+            contact_collection(), filter_query, CONTACT_LIST_PROJECTION, limit, cursor, newest_first=True
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    for message in page:
+        message["_id"] = str(message["_id"])
+    return {"messages": page, "next_cursor": next_cursor}
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from dependencies import get_current_user_for_stream
+from models import events
+
+router = APIRouter()
+
+# Comment line sent when idle so proxies keep the connection open
+HEARTBEAT_SECONDS = 15
+
+
+@router.get("/events")
+async def report_events(
+    scope: str = Query("user", pattern="^(user|department)$"),
+    current_user: dict = Depends(get_current_user_for_stream)
+):
+    # Server-sent events for report_created / report_status_changed /
+    # report_deleted: a user's own reports, or (admins) their department's
+    if scope == "department":
+        if current_user.get("role") != "Admin" or not current_user.get("department"):
+            raise HTTPException(status_code=403, detail="Admin with a department required")
+        channel = events.department_channel(current_user["department"])
+    else:
+        channel = events.user_channel(current_user["email"])
+
+    if not events.has_capacity():
+        raise HTTPException(status_code=503, detail="Too many event subscribers, retry later")
+
+    async def stream():
+        # Subscribed only while the response is actually being streamed
+        with events.subscribe([channel]) as subscriber:
+            yield events.sse_message("ready", {"scope": scope})
+            while True:
+                messages, dropped = await subscriber.next_batch(HEARTBEAT_SECONDS)
+                if dropped:
+                    # The client fell behind; it should refetch its list
+                    yield events.sse_message("resync", {"dropped": dropped})
+                if messages:
+                    yield "".join(messages)
+                else:
+                    yield ": keepalive\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
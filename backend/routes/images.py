@@ -0,0 +1,81 @@
+import re
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from models.storage import LocalDiskStorage, get_storage
+
+router = APIRouter()
+
+KEY_PATTERN = re.compile(r"[0-9a-f]{64}")
+CHUNK_SIZE = 64 * 1024
+
+
+def parse_range(range_header: str, size: int):
+    # Only single byte ranges are supported: "bytes=start-end", "bytes=start-", "bytes=-suffix"
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", range_header.strip())
+    if not match or (not match.group(1) and not match.group(2)):
+        return None
+    start, end = match.groups()
+    if start:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    else:
+        start = max(size - int(end), 0)
+        end = size - 1
+    if start > end or start >= size:
+        return None
+    return start, end
+
+
+def iter_file(path, start: int, end: int):
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+@router.get("/images/{key}")
+def get_image(key: str, request: Request):
+    storage = get_storage()
+    if not isinstance(storage, LocalDiskStorage) or not KEY_PATTERN.fullmatch(key):
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    path = storage.path_for(key)
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    # Content-addressed, so the key is a strong validator and never changes
+    etag = f'"{key}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "public, max-age=31536000, immutable",
+    }
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+
+    size = path.stat().st_size
+    range_header = request.headers.get("range")
+    if range_header:
+        byte_range = parse_range(range_header, size)
+        if byte_range is None:
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(
+            iter_file(path, start, end),
+            status_code=206,
+            media_type="image/jpeg",
+            headers=headers,
+        )
+
+    return FileResponse(path, media_type="image/jpeg", headers=headers)
@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from models.metrics import METRICS_TOKEN, render
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(authorization: str = Header(None)):
+    # Prometheus text format; protected only when METRICS_TOKEN is set
+    if METRICS_TOKEN and authorization != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
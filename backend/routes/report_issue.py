@@ -1,61 +1,31 @@
-from fastapi import APIRouter, File, UploadFile, Form, HTTPException
-from fastapi import Depends, Query, Body
-from config.cloudinary_config import cloudinary
-from datetime import datetime, timedelta
-from bson import ObjectId, Regex
-from PIL import Image
-from dependencies import get_current_user_email, get_current_user
-from io import BytesIO
-from pymongo import MongoClient
+import logging
+from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Request
+from fastapi import Depends, Query, Body, Header
 from datetime import datetime
-import os
+from typing import List, Optional
+from bson import ObjectId
+from pydantic import BaseModel
+from pymongo import ReturnDocument
+from dependencies import get_current_user_email, get_current_user
+from models.db import issues_collection
+from models import idempotency, report_hooks
+from models.batch_writer import report_writer
+from models.ingest import normalize_in_pool, enqueue_upload
+from models.response_cache import ALL_REPORTS, cached_response, user_reports_tag
+from models.pagination import fetch_page, cached_count, REPORT_SORT
+from models.geo import (
+    MAX_NEAR_RADIUS_M, cluster_fields, find_duplicate, geo_point, parse_bbox, record_duplicate
+)
+from models.search import build_report_filter, fetch_ranked_page, location_key
+from models.categories import category_to_department
+from models.bulk import (
+    MAX_BULK_REPORTS, TooManyReports, delete_reports, department_categories, select_reports, update_status
+)
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# MongoDB setup
-MONGODB_URI = os.getenv("MONGODB_URI")
-client = MongoClient(MONGODB_URI)
-db = client["StreetVoice"]
-issues_collection = db["reported_issues"]
-
-# Add this mapping somewhere near the top of your file (or import it)
-category_to_department = {
-    "Water Leakage / Issues": "Water Supply Department",
-    "Electricity Problem": "Electricity Department",
-    "Road Damage / Potholes": "Public Works Department (PWD)",
-    "Garbage / Waste": "Sanitation Department",
-    "Street Lights": "Municipal Electrical Department",
-    "Sewer / Drainage Issues": "Drainage Department / Jal Nigam",
-    "Tree Fall / Greenery": "Horticulture Department",
-    "Noise Complaint": "Pollution Control Board / Police",
-    "Encroachment": "Municipal Enforcement Department",
-    "Public Safety": "Police Department",
-    "Construction Debris": "Urban Planning or PWD",
-    "Traffic Light Issue": "Traffic Control Department",
-    "Illegal Parking": "Traffic Police Department",
-    "Stray Animals": "Animal Control Department / Municipal Corp",
-    "Water Tanker Request": "Water Supply / Jal Board",
-    "Fogging / Mosquito Issue": "Health Department / Municipal Health Wing",
-    "Broken Public Bench / Property": "Municipal Maintenance Department",
-    "Public Toilet Unclean": "Sanitation / Urban Hygiene Department",
-    "Air Pollution": "State Pollution Control Board",
-    "Noise Pollution (Religious/Events)": "Local Administration + Police",
-    "Construction Without Permit": "Urban Planning / Building Dept.",
-    "Missing Manhole Cover": "Drainage / Sewer Department",
-    "Slum/Unplanned Construction": "Slum Clearance Board / Town Planning",
-    "Overloaded Garbage Bin": "Waste Collection Unit",
-    "Street Vendor Obstruction": "Anti-Encroachment Cell"
-}
-
-
-# Function to compress image
-def compress_image(upload_file: UploadFile, quality: int = 70):
-    image = Image.open(upload_file.file)
-    image = image.convert("RGB")  # Ensure it's in RGB
-    buffer = BytesIO()
-    image.save(buffer, format="JPEG", quality=quality)
-    buffer.seek(0)
-    return buffer
 
 @router.post("/report-issue")
 async def report_issue(
@@ -63,52 +33,151 @@ async def report_issue(
     location: str = Form(...),
     description: str = Form(...),
     tags: str = Form(...),
+    latitude: float = Form(None),
+    longitude: float = Form(None),
+    idempotency_key: str = Header(None, alias="Idempotency-Key"),
     current_user_id: str = Depends(get_current_user_email)
 ):
+    point = None
+    if (latitude is None) != (longitude is None):
+        raise HTTPException(status_code=400, detail="latitude and longitude must be sent together")
+    if latitude is not None:
+        try:
+            point = geo_point(latitude, longitude)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    data = await image.read()
+    if not idempotency_key:
+        return await _create_report(data, location, description, tags, point, current_user_id)
+
+    # A retry with the same key gets the first attempt's response back
+    # instead of a second upload and insert
+    key = idempotency.scoped_key(current_user_id, idempotency_key)
     try:
-        compressed_file = compress_image(image, quality=70)
-
-        result = cloudinary.uploader.upload(
-            compressed_file,
-            transformation=[
-                {"width": 800, "crop": "scale"},
-                {"quality": "auto"},
-                {"fetch_format": "auto"},
-            ]
+        stored = await idempotency.begin(
+            key, idempotency.fingerprint(location, description, tags, latitude, longitude, data)
         )
-        image_url = result["secure_url"]
+    except idempotency.IdempotencyInProgress:
+        raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+    except idempotency.IdempotencyMismatch:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different report")
+    if stored is not None:
+        return stored
+
+    saved = False
+
+    async def complete(response: dict):
+        # Once the report is stored the key must never be released, or a
+        # retry would insert it a second time
+        nonlocal saved
+        saved = True
+        await idempotency.complete(key, response)
 
+    try:
+        response = await _create_report(data, location, description, tags, point, current_user_id, complete)
+    except BaseException:
+        if not saved:
+            await idempotency.abandon(key)
+        raise
+    if not saved:
+        await idempotency.abandon(key)
+    return response
+
+
+async def _create_report(
+    data: bytes, location: str, description: str, tags: str, point, current_user_id: str, on_saved=None
+):
+    # on_saved(response) is awaited right after the insert, before the
+    # side effects that follow it
+    try:
+        # Decode/resize/encode in the image pool so the event loop stays free
+        image_bytes, thumbnail_bytes = await normalize_in_pool(data)
     except Exception as e:
-        return {"message": f"Error uploading image to Cloudinary: {str(e)}"}
+        return {"message": f"Error processing image: {str(e)}"}
 
     try:
         issue = {
-            "image_url": image_url,
+            "image_url": None,
+            "thumbnail_url": None,
+            "image_status": "pending",
             "location": location,
+            "location_lc": location_key(location),
             "description": description,
             "tags": tags,
             "reported_at": datetime.utcnow(),
             "user_id": current_user_id,
             "status": "submitted"  
         }
-        issues_collection.insert_one(issue)
+        if point:
+            issue["geo"] = point
+            # Same problem reported nearby recently: join its cluster. The
+            # report is still saved, unclustered, if the lookup fails
+            try:
+                duplicate = await find_duplicate(issues_collection(), tags, point, issue["reported_at"])
+            except Exception:
+                logger.warning("Duplicate lookup failed; saving report without a cluster", exc_info=True)
+                duplicate = None
+            if duplicate:
+                issue.update(cluster_fields(duplicate))
+        # Buffered with other reports arriving in the same few ms
+        report_id = await report_writer.insert(issue)
     except Exception as e:
         return {"message": f"Error saving issue to MongoDB: {str(e)}"}
 
-    return {"message": "Issue reported successfully", "image_url": image_url}
+    response = {
+        "message": "Issue reported successfully",
+        "report_id": str(report_id),
+        "image_url": None,
+        "image_status": "pending",
+        "duplicate_of": str(issue["duplicate_of"]) if issue.get("duplicate_of") else None
+    }
+    if on_saved is not None:
+        await on_saved(response)
+
+    if issue.get("cluster_id"):
+        # Only the cluster's counters; the report itself is already saved
+        try:
+            await record_duplicate(issues_collection(), issue["cluster_id"])
+        except Exception:
+            logger.warning("Could not update duplicate cluster %s", issue["cluster_id"], exc_info=True)
+    await report_hooks.report_created(issue)
+
+    # Upload happens in the background; image_url is filled in when it finishes
+    await enqueue_upload(issues_collection(), report_id, image_bytes, thumbnail_bytes)
+
+    return response
 
 @router.get("/my-reports")
-def get_user_reports(current_user_email: str = Depends(get_current_user_email)):
+async def get_user_reports(
+    request: Request,
+    current_user_email: str = Depends(get_current_user_email),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str = Query(None)  # next_cursor from the previous page
+):
+    # Cached per user until one of their reports changes
+    return await cached_response(
+        request, "my-reports", current_user_email, [user_reports_tag(current_user_email)],
+        lambda: _user_reports(current_user_email, limit, cursor),
+    )
+
+
+async def _user_reports(current_user_email: str, limit: int, cursor: str | None):
     try:
-        raw_reports = issues_collection.find(
+        raw_reports, next_cursor = await fetch_page(
+            issues_collection(),
             {"user_id": current_user_email},
             {
                 "image_url": 1,
+                "thumbnail_url": 1,
+                "image_status": 1,
                 "location": 1,
                 "tags": 1,
                 "reported_at": 1,
                 "status": 1
-            }
+            },
+            limit,
+            cursor,
         )
 
         reports = []
@@ -116,112 +185,180 @@ def get_user_reports(current_user_email: str = Depends(get_current_user_email)):
             report["_id"] = str(report["_id"])  # Convert ObjectId to string
             reports.append(report)
 
-        return {"reports": reports}
+        return {"reports": reports, "next_cursor": next_cursor}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        return {"message": f"Error fetching reports: {str(e)}"}
+        raise HTTPException(status_code=500, detail=f"Error fetching reports: {str(e)}")
 
 @router.delete("/delete-report/{report_id}")
-def delete_report(report_id: str, current_user_email: str = Depends(get_current_user_email)):
+async def delete_report(report_id: str, current_user_email: str = Depends(get_current_user_email)):
     try:
-        print("Received request to delete report:", report_id)
         obj_id = ObjectId(report_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid report ID format")
 
-    print("User attempting delete:", current_user_email)
-    report = issues_collection.find_one({"_id": obj_id})
-    if report:
-        print("Found report:", report)
-    else:
-        print("Report not found in DB.")
-
-    result = issues_collection.delete_one({
+    # Returns the deleted document, which the stats hooks need
+    report = await issues_collection().find_one_and_delete({
         "_id": obj_id,
         "user_id": current_user_email
     })
 
-    print("Deleted count:", result.deleted_count)
-
-    if result.deleted_count == 0:
+    if not report:
         raise HTTPException(status_code=404, detail="Report not found or not authorized")
 
+    logger.info("Report deleted", extra={"report_id": report_id, "user_id": current_user_email})
+    await report_hooks.report_deleted(report)
+
     return {"message": "Report deleted successfully"}
 
 
 @router.get("/all-reports")
-def get_all_reports(
+async def get_all_reports(
+    request: Request,
     current_user: dict = Depends(get_current_user),
-    page: int = Query(1, ge=1),
+    page: int = Query(1, ge=1),  # legacy offset paging, prefer cursor
     limit: int = Query(20, ge=1, le=100),
-    search: str = Query(None),
+    cursor: str = Query(None),  # next_cursor from the previous page
+    include_total: bool = Query(True),
+    search: str = Query(None),  # category name or free text
     status: str = Query(None),
     tag: str = Query(None),
-    date: str = Query(None)  # single date filter in ISO format, e.g., '2025-05-17'
+    location: str = Query(None),  # location prefix
+    date: str = Query(None),  # single date filter in ISO format, e.g., '2025-05-17'
+    sort: str = Query("newest", pattern="^(newest|relevance)$")
 ):
     if current_user.get("role") != "Admin":
         raise HTTPException(status_code=403, detail="Not authorized to access all reports")
 
+    # Every admin sees the same pages, so they share cache entries
+    return await cached_response(
+        request, "all-reports", "admin", [ALL_REPORTS],
+        lambda: _all_reports(page, limit, cursor, include_total, search, status, tag, location, date, sort),
+    )
+
+
+async def _all_reports(page, limit, cursor, include_total, search, status, tag, location, date, sort):
     try:
-        skip = (page - 1) * limit
-        filter_query = {}
-
-        # Search filter
-        if search:
-            regex = {"$regex": search, "$options": "i"}
-            filter_query["$or"] = [
-                {"tags": regex},
-                {"location": regex}
-            ]
-
-        # Status filter
-        if status and status.lower() != "all":
-            filter_query["status"] = status
-
-        # Tag filter
-        if tag and tag.lower() != "all":
-            filter_query["tags"] = {"$regex": tag, "$options": "i"}
-
-        # Single date filter (fetch reports where reported_at is on this date)
-        if date:
-            date_obj = datetime.fromisoformat(date)
-            next_day = date_obj + timedelta(days=1)
-            filter_query["reported_at"] = {
-                "$gte": date_obj,
-                "$lt": next_day
-            }
-
-        raw_reports_cursor = issues_collection.find(
-            filter_query,
-            {
-                "image_url": 1,
-                "location": 1,
-                "tags": 1,
-                "reported_at": 1,
-                "status": 1,
-                "user_id": 1,
-                "description":1
-            }
-        ).sort("reported_at", -1).skip(skip).limit(limit)
+        filter_query = build_report_filter(search, status, tag, location, date)
+        projection = {
+            "image_url": 1,
+            "thumbnail_url": 1,
+            "image_status": 1,
+            "location": 1,
+            "tags": 1,
+            "reported_at": 1,
+            "status": 1,
+            "user_id": 1,
+            "description":1,
+            "suggestion": 1,
+            "cluster_id": 1,
+            "duplicate_count": 1
+        }
+
+        if sort == "relevance" and "$text" in filter_query:
+            raw_reports = await fetch_ranked_page(
+                issues_collection(), filter_query, projection, limit, skip=(page - 1) * limit
+            )
+            next_cursor = None
+        else:
+            raw_reports, next_cursor = await fetch_page(
+                issues_collection(),
+                filter_query,
+                projection,
+                limit,
+                cursor,
+                skip=0 if cursor else (page - 1) * limit,
+            )
 
         reports = []
-        for report in raw_reports_cursor:
+        for report in raw_reports:
             report["_id"] = str(report["_id"])
+            if report.get("cluster_id"):
+                report["cluster_id"] = str(report["cluster_id"])
             reports.append(report)
 
-        total_count = issues_collection.count_documents(filter_query)
+        # Cached for a short while, so it may lag recent writes slightly
+        total_count = await cached_count(issues_collection(), filter_query) if include_total else None
 
         return {
             "reports": reports,
             "page": page,
             "limit": limit,
-            "total_count": total_count
+            "total_count": total_count,
+            "next_cursor": next_cursor
         }
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching reports: {str(e)}")
 
+@router.get("/reports/near")
+async def get_reports_near(
+    current_user: dict = Depends(get_current_user),
+    lat: float = Query(None),
+    lng: float = Query(None),
+    radius_m: float = Query(500, gt=0, le=MAX_NEAR_RADIUS_M),
+    bbox: str = Query(None),  # minLng,minLat,maxLng,maxLat (instead of lat/lng)
+    tag: str = Query(None),
+    status: str = Query(None),
+    limit: int = Query(100, ge=1, le=500)
+):
+    try:
+        filter_query = build_report_filter(status=status, tag=tag)
+        projection = {
+            "image_url": 1,
+            "thumbnail_url": 1,
+            "location": 1,
+            "tags": 1,
+            "reported_at": 1,
+            "status": 1,
+            "geo": 1,
+            "cluster_id": 1,
+            "duplicate_count": 1
+        }
+        # Reporter emails are only visible to admins
+        if current_user.get("role") == "Admin":
+            projection["user_id"] = 1
+
+        if bbox:
+            filter_query["geo"] = {"$geoWithin": {"$geometry": parse_bbox(bbox)}}
+            raw_reports = await issues_collection().find(filter_query, projection).sort(REPORT_SORT).limit(limit).to_list()
+        elif lat is not None and lng is not None:
+            # Nearest first, with the distance in metres
+            cursor = await issues_collection().aggregate([
+                {"$geoNear": {
+                    "near": geo_point(lat, lng),
+                    "distanceField": "distance_m",
+                    "maxDistance": radius_m,
+                    "query": filter_query,
+                    "spherical": True
+                }},
+                {"$limit": limit},
+                {"$project": {**projection, "distance_m": 1}}
+            ])
+            raw_reports = await cursor.to_list()
+        else:
+            raise HTTPException(status_code=400, detail="Provide lat and lng, or bbox")
+
+        reports = []
+        for report in raw_reports:
+            report["_id"] = str(report["_id"])
+            if report.get("cluster_id"):
+                report["cluster_id"] = str(report["cluster_id"])
+            reports.append(report)
+
+        return {"reports": reports}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching nearby reports: {str(e)}")
+
 @router.put("/update-report-status/{report_id}")
-def update_report_status(
+async def update_report_status(
     report_id: str,
     new_status: str = Body(..., embed=True),
     current_user: dict = Depends(get_current_user)  # changed from email to full user info
@@ -236,7 +373,7 @@ def update_report_status(
         raise HTTPException(status_code=403, detail="Only admins can update report status")
 
     # Fetch the report
-    report = issues_collection.find_one({"_id": obj_id})
+    report = await issues_collection().find_one({"_id": obj_id})
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
 
@@ -254,13 +391,98 @@ def update_report_status(
     if current_user.get("department") != responsible_dept:
         raise HTTPException(status_code=403, detail="You are not authorized to update reports of this category")
 
-    # Update status
-    update_result = issues_collection.update_one(
-        {"_id": obj_id},
-        {"$set": {"status": new_status}}
+    # Update status; the pre-update document tells us the old status
+    previous = await issues_collection().find_one_and_update(
+        {"_id": obj_id, "status": {"$ne": new_status}},
+        {"$set": {"status": new_status}},
+        return_document=ReturnDocument.BEFORE
     )
 
-    if update_result.modified_count == 0:
+    if previous is None:
         return {"message": "Status was already set to this value"}
 
-    return {"message": "Report status updated successfully"}
\ No newline at end of file
+    await report_hooks.report_status_changed(previous, new_status)
+
+    return {"message": "Report status updated successfully"}
+
+
+class BulkFilter(BaseModel):
+    # Same filters as /all-reports
+    search: Optional[str] = None
+    status: Optional[str] = None
+    tag: Optional[str] = None
+    location: Optional[str] = None
+    date: Optional[str] = None
+
+
+class BulkRequest(BaseModel):
+    # Either explicit report IDs or a filter
+    ids: Optional[List[str]] = None
+    filter: Optional[BulkFilter] = None
+
+
+class BulkStatusRequest(BulkRequest):
+    new_status: str
+
+
+async def _select_for_admin(request: BulkRequest, current_user: dict):
+    if current_user.get("role") != "Admin":
+        raise HTTPException(status_code=403, detail="Only admins can run bulk operations")
+    categories = department_categories(current_user.get("department"))
+    if not categories:
+        raise HTTPException(status_code=403, detail="No categories assigned to this admin's department")
+
+    if (request.ids is None) == (request.filter is None):
+        raise HTTPException(status_code=400, detail="Provide either ids or filter")
+    if request.ids is not None and len(request.ids) > MAX_BULK_REPORTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_REPORTS} ids per request")
+
+    try:
+        filter_query = None
+        if request.filter is not None:
+            f = request.filter
+            filter_query = build_report_filter(f.search, f.status, f.tag, f.location, f.date)
+        return await select_reports(categories, ids=request.ids, filter_query=filter_query)
+    except (ValueError, TooManyReports) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _bulk_response(results: dict, **counts):
+    return {**counts, "results": [{"report_id": report_id, "result": result} for report_id, result in results.items()]}
+
+
+@router.put("/bulk/update-report-status")
+async def bulk_update_report_status(
+    request: BulkStatusRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    # Department check, update and counters are one query/write each, not one per report
+    reports, results = await _select_for_admin(request, current_user)
+    try:
+        updated, update_results = await update_status(reports, request.new_status)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error updating reports: {str(e)}")
+    results.update(update_results)
+
+    await report_hooks.reports_status_changed(updated, request.new_status)
+
+    return _bulk_response(results, updated=len(updated))
+
+
+@router.post("/bulk/delete-reports")
+async def bulk_delete_reports(
+    request: BulkRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    # Admins can remove reports in their department's categories (spam, duplicates)
+    reports, results = await _select_for_admin(request, current_user)
+    try:
+        deleted, delete_results = await delete_reports(reports)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error deleting reports: {str(e)}")
+    results.update(delete_results)
+
+    # Only the reports this request removed; others were deleted elsewhere
+    await report_hooks.reports_deleted(deleted)
+
+    return _bulk_response(results, deleted=len(deleted))
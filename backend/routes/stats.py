@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from dependencies import get_current_admin
+from models.stats import get_stats
+
+router = APIRouter()
+
+
+@router.get("/stats")
+async def get_report_stats(
+    current_user: dict = Depends(get_current_admin),
+    days: int = Query(30, ge=1, le=366)  # length of the per-day breakdown
+):
+    # Admins only see counts for the categories their department handles
+    department = current_user.get("department")
+    if not department:
+        raise HTTPException(status_code=403, detail="No department assigned to this admin")
+
+    try:
+        stats = await get_stats(department, days=days)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching stats: {str(e)}")
+
+    return {"department": department, **stats}
@@ -1,7 +1,16 @@
+import json
+import logging
+from typing import Optional
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from models.suggestion import get_suggestion
-from dependencies import get_current_user_email  
+from bson import ObjectId
+from models.suggestion import (
+    get_suggestion, stream_suggestion, save_suggestion, stored_suggestion, SuggestionError
+)
+from dependencies import get_current_user
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -9,22 +18,92 @@ class SuggestionRequest(BaseModel):
     tag: str
     location: str
     description: str
+    report_id: Optional[str] = None  # store the suggestion on this report
+
+def _report_id(request: SuggestionRequest):
+    if not request.report_id:
+        return None
+    try:
+        return ObjectId(request.report_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid report ID format")
+
+def _can_save(current_user: dict) -> bool:
+    # Only admins may write suggestions onto reports
+    return current_user.get("role") == "Admin"
 
 @router.post("/suggestion")
-def get_suggestion_for_admin(
+async def get_suggestion_for_admin(
     request: SuggestionRequest,
-    current_user_email: str = Depends(get_current_user_email)
+    current_user: dict = Depends(get_current_user)
 ):
     # Optional: You can restrict access here to admin users only
     # if current_user_email not in admin_list:
     #     raise HTTPException(status_code=403, detail="Not authorized")
+    report_id = _report_id(request)
 
     try:
-        suggestion = get_suggestion(
+        # Precomputed in the background when the report was filed
+        if report_id:
+            stored = await stored_suggestion(report_id)
+            if stored:
+                return {"suggestion": stored}
+
+        suggestion = await get_suggestion(
             tag=request.tag,
             location=request.location,
             description=request.description
         )
+        if report_id and _can_save(current_user):
+            await save_suggestion(report_id, suggestion)
         return {"suggestion": suggestion}
+    except SuggestionError as e:
+        raise HTTPException(status_code=502, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/suggestion/stream")
+async def stream_suggestion_for_admin(
+    request: SuggestionRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    # Server-sent events: "chunk" events with partial text, then "done" with
+    # the full suggestion (or "error")
+    report_id = _report_id(request)
+
+    async def events():
+        if report_id:
+            try:
+                stored = await stored_suggestion(report_id)
+            except Exception:
+                stored = None
+            if stored:
+                yield _sse("chunk", {"text": stored})
+                yield _sse("done", {"suggestion": stored})
+                return
+
+        pieces = []
+        try:
+            async for text in stream_suggestion(request.tag, request.location, request.description):
+                pieces.append(text)
+                yield _sse("chunk", {"text": text})
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+            return
+
+        suggestion = "".join(pieces) or "No suggestion returned by the model."
+        if report_id and _can_save(current_user):
+            try:
+                await save_suggestion(report_id, suggestion)
+            except Exception:
+                logger.exception("Error saving suggestion", extra={"report_id": str(report_id)})
+        yield _sse("done", {"suggestion": suggestion})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
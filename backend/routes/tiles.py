@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from dependencies import get_current_user_email
+from models.categories import category_to_department
+from models.stats import from_field_key
+from models.tiles import MAX_ZOOM, cell_count, tile_cells
+
+router = APIRouter()
+
+
+@router.get("/tiles/{z}/{x}/{y}")
+async def get_tile(
+    z: int,
+    x: int,
+    y: int,
+    department: str = Query(None),
+    tag: str = Query(None),
+    status: str = Query(None),
+    breakdown: bool = Query(False),  # include per-category/status counts
+    email: str = Depends(get_current_user_email)
+):
+    if not (0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise HTTPException(status_code=400, detail="Tile coordinates out of range")
+
+    tags = None
+    if department:
+        tags = {t for t, d in category_to_department.items() if d == department}
+    if tag:
+        tags = {tag} if tags is None else tags & {tag}
+
+    try:
+        cells = await tile_cells(z, x, y)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching tile: {str(e)}")
+
+    # Each cell: [geohash, lat, lng, count] (+ {category: {status: count}})
+    result = []
+    for cell in cells:
+        count = cell_count(cell, tags, status)
+        if not count:
+            continue
+        row = [cell["gh"], round(cell["loc"][1], 6), round(cell["loc"][0], 6), count]
+        if breakdown:
+            row.append({
+                from_field_key(t): {from_field_key(s): n for s, n in by_status.items() if n}
+                for t, by_status in cell.get("counts", {}).items()
+                if tags is None or from_field_key(t) in tags
+            })
+        result.append(row)
+
+    return {"z": z, "x": x, "y": y, "cells": result}
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("pymongo")
+
+from pymongo.errors import BulkWriteError, WriteError  # noqa: E402
+
+from models.batch_writer import BatchWriter  # noqa: E402
+
+
+class FakeCollection:
+    """insert_many that assigns _ids and fails the documents at `fail_indexes`."""
+
+    def __init__(self, fail_indexes=()):
+        self.fail_indexes = set(fail_indexes)
+        self.batches = []
+
+    async def insert_many(self, docs, ordered=True):
+        assert not ordered
+        self.batches.append(len(docs))
+        for i, doc in enumerate(docs):
+            doc["_id"] = f"id-{i}"
+        errors = [{"index": i, "code": 11000, "errmsg": f"duplicate {i}"} for i in sorted(self.fail_indexes)]
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(docs) - len(errors)})
+
+
+async def insert_all(writer, count):
+    return await asyncio.gather(*(writer.insert({"n": i}) for i in range(count)), return_exceptions=True)
+
+
+def test_partial_failure_fails_only_its_own_caller():
+    collection = FakeCollection(fail_indexes=[1, 3])
+    writer = BatchWriter(lambda: collection, max_batch=10, window_ms=5)
+
+    results = asyncio.run(insert_all(writer, 4))
+
+    assert collection.batches == [4]
+    assert results[0] == "id-0" and results[2] == "id-2"
+    for index in (1, 3):
+        assert isinstance(results[index], WriteError)
+        assert results[index].code == 11000
+        assert results[index].details["errmsg"] == f"duplicate {index}"
+
+
+def test_full_batch_flushes_without_waiting_for_the_window():
+    collection = FakeCollection()
+    writer = BatchWriter(lambda: collection, max_batch=3, window_ms=60_000)
+
+    results = asyncio.run(asyncio.wait_for(insert_all(writer, 3), timeout=5))
+
+    assert results == ["id-0", "id-1", "id-2"]
+    assert collection.batches == [3]
+
+
+def test_other_errors_fail_the_whole_batch():
+    class Broken:
+        async def insert_many(self, docs, ordered=True):
+            raise ConnectionError("mongo is down")
+
+    writer = BatchWriter(Broken, max_batch=10, window_ms=5)
+
+    results = asyncio.run(insert_all(writer, 2))
+
+    assert all(isinstance(result, ConnectionError) for result in results)
@@ -0,0 +1,37 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("pymongo")
+
+from models import bulk  # noqa: E402
+
+
+class FakeIssues:
+    """delete_one over a set of ids; ids in `broken` raise."""
+
+    def __init__(self, ids, broken=()):
+        self.ids = set(ids)
+        self.broken = set(broken)
+
+    async def delete_one(self, query):
+        if query["_id"] in self.broken:
+            raise ConnectionError("mongo is down")
+        present = query["_id"] in self.ids
+        self.ids.discard(query["_id"])
+        return SimpleNamespace(deleted_count=int(present))
+
+
+def test_delete_reports_only_reports_what_it_removed(monkeypatch):
+    # 2 was deleted elsewhere after it was selected, 3 fails
+    issues = FakeIssues(ids=[1, 3, 4], broken=[3])
+    monkeypatch.setattr(bulk, "issues_collection", lambda: issues)
+    monkeypatch.setattr(bulk, "DELETE_CONCURRENCY", 2)
+    reports = [{"_id": report_id} for report_id in (1, 2, 3, 4)]
+
+    deleted, results = asyncio.run(bulk.delete_reports(reports))
+
+    assert [report["_id"] for report in deleted] == [1, 4]
+    assert results == {"1": "deleted", "2": "not_found", "3": "failed", "4": "deleted"}
+    assert issues.ids == {3}
@@ -0,0 +1,30 @@
+import pytest
+
+pytest.importorskip("pymongo")
+
+from models.idempotency import fingerprint, scoped_key  # noqa: E402
+
+
+def test_scoped_key_is_per_user_and_ignores_surrounding_space():
+    assert scoped_key("a@example.com", " key-1 \n") == "a@example.com:key-1"
+    assert scoped_key("a@example.com", "key-1") != scoped_key("b@example.com", "key-1")
+
+
+def test_fingerprint_is_stable():
+    assert fingerprint("Rajpur Road", "pothole", 30.3, None, b"\xff\xd8") == fingerprint(
+        "Rajpur Road", "pothole", 30.3, None, b"\xff\xd8"
+    )
+
+
+@pytest.mark.parametrize("other", [
+    ("Rajpur Road", "pothole", 30.3, None, b"\xff\xd9"),  # different image
+    ("Rajpur Road", "pothole", "30.3", None, b"\xff\xd8"),  # str vs float
+    ("Rajpur Road", "pothole", 30.3, b"\xff\xd8"),  # missing part
+])
+def test_fingerprint_changes_with_the_body(other):
+    assert fingerprint("Rajpur Road", "pothole", 30.3, None, b"\xff\xd8") != fingerprint(*other)
+
+
+def test_fingerprint_separates_parts():
+    assert fingerprint("ab", "c") != fingerprint("a", "bc")
+    assert fingerprint(b"ab", b"c") != fingerprint(b"a", b"bc")
@@ -0,0 +1,31 @@
+from io import BytesIO
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from models.image import draft_to_edge, normalize_image  # noqa: E402
+
+
+def jpeg(width: int, height: int) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), (120, 80, 40)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def test_draft_reduces_4_3_photo():
+    image = Image.open(BytesIO(jpeg(4000, 3000)))
+    draft_to_edge(image, 1600)
+    assert image.size == (2000, 1500)
+
+
+def test_draft_leaves_small_photo_alone():
+    image = Image.open(BytesIO(jpeg(1200, 900)))
+    draft_to_edge(image, 1600)
+    assert image.size == (1200, 900)
+
+
+def test_normalize_caps_long_edge():
+    data, thumbnail = normalize_image(jpeg(4000, 3000), max_edge=1600, thumbnail_edge=320)
+    assert Image.open(BytesIO(data)).size == (1600, 1200)
+    assert Image.open(BytesIO(thumbnail)).size == (320, 240)
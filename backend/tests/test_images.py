@@ -0,0 +1,30 @@
+import pytest
+
+pytest.importorskip("fastapi")
+
+from routes.images import parse_range  # noqa: E402
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=900-5000", (900, 999)),  # end past the file is clamped
+    ("bytes=-200", (800, 999)),  # suffix range: the last 200 bytes
+    ("bytes=-5000", (0, 999)),  # suffix longer than the file: all of it
+    (" bytes=0-0 ", (0, 0)),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", [
+    "bytes=1000-",  # starts past the end: 416
+    "bytes=500-100",
+    "bytes=-0",
+    "bytes=-",
+    "bytes=0-99,200-299",  # multiple ranges aren't supported
+    "items=0-99",
+    "",
+])
+def test_parse_range_unsatisfiable(header):
+    assert parse_range(header, 1000) is None
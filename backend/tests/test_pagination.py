@@ -0,0 +1,30 @@
+from datetime import datetime
+
+import pytest
+
+bson = pytest.importorskip("bson")
+
+from models.pagination import decode_cursor, decode_id_cursor, encode_cursor  # noqa: E402
+
+
+def test_cursor_round_trip():
+    reported_at = datetime(2025, 6, 1, 9, 30, 15, 123456)
+    report_id = bson.ObjectId()
+
+    token = encode_cursor(reported_at, report_id)
+
+    assert "=" not in token
+    assert decode_cursor(token) == (reported_at, report_id)
+
+
+@pytest.mark.parametrize("token", ["", "not a cursor", "e30", encode_cursor(datetime(2025, 1, 1), "x" * 24)])
+def test_decode_cursor_rejects_garbage(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
+
+
+def test_id_cursor():
+    report_id = bson.ObjectId()
+    assert decode_id_cursor(str(report_id)) == report_id
+    with pytest.raises(ValueError):
+        decode_id_cursor("nope")
@@ -0,0 +1,62 @@
+import pytest
+
+pytest.importorskip("pymongo")
+
+from models import ratelimit  # noqa: E402
+from models.ratelimit import RateLimited, RateLimiter  # noqa: E402
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_burst_then_limited(clock):
+    limiter = RateLimiter(rate=3, per=60)
+    for _ in range(3):
+        limiter.hit("ip")
+    with pytest.raises(RateLimited) as excinfo:
+        limiter.hit("ip")
+    # One token comes back every 20 seconds
+    assert excinfo.value.retry_after == pytest.approx(20)
+
+
+def test_tokens_refill_over_time(clock):
+    limiter = RateLimiter(rate=3, per=60)
+    for _ in range(3):
+        limiter.hit("ip")
+
+    clock[0] += 19
+    with pytest.raises(RateLimited) as excinfo:
+        limiter.hit("ip")
+    assert excinfo.value.retry_after == pytest.approx(1)
+
+    clock[0] += 1
+    limiter.hit("ip")
+    with pytest.raises(RateLimited):
+        limiter.hit("ip")
+
+
+def test_refill_is_capped_at_burst(clock):
+    limiter = RateLimiter(rate=3, per=60)
+    limiter.hit("ip")
+    clock[0] += 3600
+    for _ in range(3):
+        limiter.hit("ip")
+    with pytest.raises(RateLimited):
+        limiter.hit("ip")
+
+
+def test_keys_are_independent_and_bounded(clock):
+    limiter = RateLimiter(rate=1, per=60, max_keys=2)
+    limiter.hit("a")
+    limiter.hit("b")
+    with pytest.raises(RateLimited):
+        limiter.hit("b")
+    # "c" pushes out the least recently used bucket ("a"), which starts full again
+    limiter.hit("c")
+    limiter.hit("a")
+    with pytest.raises(RateLimited):
+        limiter.hit("c")
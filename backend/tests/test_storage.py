@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("cloudinary")
+requests = pytest.importorskip("requests")
+
+import cloudinary  # noqa: E402
+
+from config import cloudinary_config  # noqa: E402
+from models import storage  # noqa: E402
+
+
+@pytest.fixture
+def cloudinary_storage(monkeypatch):
+    monkeypatch.setattr(cloudinary_config, "_configured", True)
+    monkeypatch.setattr(cloudinary.config(), "cloud_name", "demo", raising=False)
+    instance = storage.CloudinaryStorage()
+    uploads = []
+    monkeypatch.setattr(instance, "store", lambda key, data: uploads.append(key) or f"https://uploaded/{key}")
+    return instance, uploads
+
+
+def test_image_storage_is_abstract():
+    with pytest.raises(TypeError):
+        storage.ImageStorage()
+
+
+def test_cloudinary_skips_upload_of_image_stored_elsewhere(monkeypatch, cloudinary_storage):
+    instance, uploads = cloudinary_storage
+    heads = []
+    monkeypatch.setattr(requests, "head", lambda url, timeout: heads.append(url) or SimpleNamespace(status_code=200))
+
+    first = instance.put(b"photo")
+    second = instance.put(b"photo")
+
+    assert uploads == []
+    assert first == second
+    assert first["url"].endswith(f"/streetvoice/{storage.content_key(b'photo')}")
+    # The second put is answered from the per-process cache
+    assert len(heads) == 1
+
+
+@pytest.mark.parametrize("head", [
+    lambda url, timeout: SimpleNamespace(status_code=404),
+    lambda url, timeout: (_ for _ in ()).throw(requests.ConnectionError("offline")),
+])
+def test_cloudinary_uploads_when_not_found_or_unknown(monkeypatch, cloudinary_storage, head):
+    instance, uploads = cloudinary_storage
+    monkeypatch.setattr(requests, "head", head)
+
+    result = instance.put(b"photo")
+
+    assert uploads == [result["key"]]
+    assert result["url"] == f"https://uploaded/{result['key']}"
@@ -0,0 +1,26 @@
+import pytest
+
+pytest.importorskip("pymongo")
+
+from models.tiles import geohash_center, geohash_encode  # noqa: E402
+
+
+@pytest.mark.parametrize("latitude, longitude, precision, expected", [
+    (57.64911, 10.40744, 11, "u4pruydqqvj"),
+    (42.6, -5.6, 5, "ezs42"),
+    (-33.8688, 151.2093, 6, "r3gx2f"),
+])
+def test_geohash_encode(latitude, longitude, precision, expected):
+    assert geohash_encode(latitude, longitude, precision) == expected
+
+
+def test_geohash_prefixes_nest():
+    full = geohash_encode(30.3165, 78.0322, 7)
+    for precision in range(1, 7):
+        assert geohash_encode(30.3165, 78.0322, precision) == full[:precision]
+
+
+def test_geohash_center_is_inside_the_cell():
+    cell = geohash_encode(30.3165, 78.0322, 6)
+    latitude, longitude = geohash_center(cell)
+    assert geohash_encode(latitude, longitude, 6) == cell